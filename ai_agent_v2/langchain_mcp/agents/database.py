@@ -9,7 +9,7 @@ import json
 import logging
 from typing import Any, Dict
 
-from config import get_db_url
+from config import DB_URL
 from database.agent import DatabaseQueryAgent
 from database.connection import DatabaseConnection
 from models.anthropic import AnthropicModelHandler
@@ -27,7 +27,7 @@ class DatabaseAgent:
     def __init__(self):
         self.model_handler = AnthropicModelHandler()
         self.mcp_config = None
-        self.db_url = get_db_url()
+        self.db_url = DB_URL
         self.db_connection = None
         self.db_agent = None
 
@@ -74,14 +74,9 @@ DB_SCHEMA_DESCRIPTION = """
 """
 
 
-# データベース接続URL
-def get_db_url():
-    """データベースの接続URLを取得"""
-    if DB_TYPE == DBType.MYSQL:
-        return f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    elif DB_TYPE == DBType.POSTGRESQL:
-        return f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    elif DB_TYPE == DBType.SQLITE:
-        return f"sqlite:///{DB_NAME}"
-    else:
-        raise ValueError(f"Unsupported database type: {DB_TYPE}")
+# データベース接続URL（DB_TYPEは不正な値だとDBType()で例外になるため必ず存在する）
+DB_URL = {
+    DBType.MYSQL: f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    DBType.POSTGRESQL: f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    DBType.SQLITE: f"sqlite:///{DB_NAME}",
+}[DB_TYPE]
@@ -8,7 +8,7 @@ SQLAlchemyを使用してデータベースへの接続を管理します。
 import logging
 from typing import Dict, List
 
-from config import DB_SCHEMA_DESCRIPTION, get_db_url
+from config import DB_SCHEMA_DESCRIPTION, DB_URL
 from langchain_community.utilities import SQLDatabase
 from sqlalchemy import MetaData, create_engine, inspect, text
 
@@ -40,7 +40,7 @@ class DatabaseConnection:
             bool: 接続成功時はTrue、失敗時はFalse
         """
         try:
-            db_url = get_db_url()
+            db_url = DB_URL
             print(f"データベースURL: {db_url}")
             self._engine = create_engine(db_url)
             self._connection = self._engine.connect()
@@ -41,6 +41,9 @@ class DBQueryAgent:
         self.db_connection = db_connection
         self.nl_query_processor = None
         self.prompts = get_agent_prompts()
+        self.system_message = SystemMessage(
+            content=self.prompts.get("db_query", "")
+        )
 
     async def initialize(self):
         """
@@ -85,12 +88,11 @@ class DBQueryAgent:
                 error_message = result.get("error", "不明なエラー")
                 explanation = result.get("explanation", "詳細情報はありません")
 
-                logger.error(f"データベースクエリ処理エラー: {error_message}")
+                logger.error("データベースクエリ処理エラー: %s", error_message)
 
                 # エラー説明の生成
-                db_prompt = self.prompts.get("db_query", "")
                 messages = [
-                    SystemMessage(content=db_prompt),
+                    self.system_message,
                     HumanMessage(
                         content=f"次のユーザークエリの処理中にエラーが発生しました：\n\n{query}\n\nエラー：{error_message}\n\n{explanation}\n\nユーザーにわかりやすく説明してください。"
                     ),
@@ -108,7 +110,7 @@ class DBQueryAgent:
                 raw_result = result.get("raw_result", [])
                 explanation = result.get("explanation", "")
 
-                logger.info(f"データベースクエリ実行成功: {sql_query}")
+                logger.info("データベースクエリ実行成功: %s", sql_query)
 
                 formatted_result = {
                     "query": sql_query,
@@ -125,7 +127,7 @@ class DBQueryAgent:
             }
 
         except Exception as e:
-            logger.error(f"DBクエリエージェント処理エラー: {str(e)}")
+            logger.error("DBクエリエージェント処理エラー: %s", e)
 
             # エラー時の状態更新
             return {
@@ -5,18 +5,34 @@ GitHubリポジトリのコードを検索・分析し、問題を発見する
 LangGraphフレームワークに対応
 """
 
+import asyncio
 import logging
 import re
 from typing import Any, Dict, List, Optional
 
-from config import get_agent_prompts
-from core.utils import analyze_code_issues
+from config import TOOL_RESULT_PROMPT_CHARS, get_agent_prompts
+from core.utils import analyze_code_issues, truncate_for_llm
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 from tools.handlers import ToolManager
 
 logger = logging.getLogger(__name__)
 
+# クエリ中の引用符で囲まれた検索語
+_QUOTED_TERM_RE = re.compile(r'"([^"]+)"')
+# コード検索結果に含まれるソースファイルのパス
+_CODE_FILE_PATH_RE = re.compile(r"[a-zA-Z0-9_\-/.]+\.(?:py|js|ts|go|java|rb)")
+# コード検索結果に含まれるリポジトリ名（owner/repo:）
+_REPO_NAME_RE = re.compile(r"[a-zA-Z0-9_\-.]+/[a-zA-Z0-9_\-.]+(?=:)")
+
+# 未解決の問題一覧を取得するクエリのキーワード
+_ISSUE_KEYWORD_RE = re.compile("問題|issue|バグ", re.IGNORECASE)
+
+# 分析結果に含まれていれば対応が必要とみなすキーワード
+_ACTION_TERM_RE = re.compile(
+    "修正|対応|改善|必要|should|must|fix|improve", re.IGNORECASE
+)
+
 
 class GitHubResearchAgent:
     """
@@ -41,6 +57,9 @@ class GitHubResearchAgent:
         self.llm = llm
         self.tool_manager = tool_manager
         self.prompts = get_agent_prompts()
+        self.system_message = SystemMessage(
+            content=self.prompts.get("github_research", "")
+        )
 
     async def _extract_search_terms(self, query: str) -> List[str]:
         """
@@ -53,16 +72,14 @@ class GitHubResearchAgent:
             List[str]: 抽出された検索語のリスト
         """
         # 引用符で囲まれたフレーズを抽出
-        quote_pattern = r'"([^"]+)"'
-        quoted_terms = re.findall(quote_pattern, query)
+        quoted_terms = _QUOTED_TERM_RE.findall(query)
 
         if quoted_terms:
             return quoted_terms
 
         # LLMを使用して検索語を推測
-        github_prompt = self.prompts.get("github_research", "")
         messages = [
-            SystemMessage(content=github_prompt),
+            self.system_message,
             HumanMessage(
                 content=f"次のユーザークエリから、コード検索に使用すべき重要なキーワードを最大3つ抽出してください。キーワードのみをカンマ区切りのリストとして返してください。\n\nクエリ: {query}"
             ),
@@ -115,8 +132,7 @@ class GitHubResearchAgent:
                 raise ValueError("ToolManagerが初期化されていません")
 
             # ツールの利用可能性を確認
-            tools = await self.tool_manager.list_available_tools()
-            tool_names = [tool.name for tool in tools]
+            tool_names = await self.tool_manager.available_tool_names()
 
             github_info = []
             search_results = {}
@@ -143,28 +159,25 @@ class GitHubResearchAgent:
 
                     # コードファイルの分析
                     if search_result and "github_get_content" in tool_names:
-                        # ファイルパスを抽出
-                        file_paths = re.findall(
-                            r"([a-zA-Z0-9_\-/\.]+\.(py|js|ts|go|java|rb))",
-                            search_result,
-                        )
+                        # 最初のファイルパスを抽出
+                        file_path_match = _CODE_FILE_PATH_RE.search(search_result)
 
-                        if file_paths:
+                        if file_path_match:
                             # 最初のファイルを取得
-                            file_path = file_paths[0][0]
-                            repo_match = re.search(
-                                r"([a-zA-Z0-9_\-\.]+/[a-zA-Z0-9_\-\.]+):", search_result
-                            )
+                            file_path = file_path_match.group()
+                            repo_match = _REPO_NAME_RE.search(search_result)
 
                             if repo_match:
-                                repo_name = repo_match.group(1)
+                                repo_name = repo_match.group()
                                 content_result = await self.tool_manager.execute_tool(
                                     "github_get_content",
                                     {"repo": repo_name, "path": file_path},
                                 )
 
-                                # コード分析の実行
-                                analysis = analyze_code_issues(content_result, term)
+                                # コード分析の実行（CPU処理のためイベントループを止めないようスレッドで実行）
+                                analysis = await asyncio.to_thread(
+                                    analyze_code_issues, content_result, term
+                                )
                                 code_analyses.append(
                                     {
                                         "file": file_path,
@@ -177,9 +190,7 @@ class GitHubResearchAgent:
                                 )
 
             # 未解決の問題を取得
-            if "github_list_issues" in tool_names and (
-                "問題" in query or "issue" in query.lower() or "バグ" in query
-            ):
+            if "github_list_issues" in tool_names and _ISSUE_KEYWORD_RE.search(query):
                 issues_info = await self.tool_manager.execute_tool(
                     "github_list_issues", {"state": "open"}
                 )
@@ -194,11 +205,13 @@ class GitHubResearchAgent:
                     github_info.append(f"リポジトリ一覧:\n{repos_info}")
 
             # LLMを使用して結果を分析・整理
-            github_prompt = self.prompts.get("github_research", "")
-            combined_info = "\n\n".join(github_info)
+            # 大きなツール結果はプロンプトに含める分だけ切り詰める（raw_infoは全文を保持）
+            combined_info = "\n\n".join(
+                truncate_for_llm(info, TOOL_RESULT_PROMPT_CHARS) for info in github_info
+            )
 
             messages = [
-                SystemMessage(content=github_prompt),
+                self.system_message,
                 HumanMessage(
                     content=f"次のGitHubリポジトリ情報を分析し、技術的問題点をまとめてください。\n\nユーザークエリ: {query}\n\n取得情報:\n{combined_info}"
                 ),
@@ -217,27 +230,10 @@ class GitHubResearchAgent:
             }
 
             # Notionタスク作成が必要かどうかを評価
+            # （大文字小文字を区別しない正規表現で照合し、小文字化したコピーを作らない）
             needs_task = query_type == "task_creation" or (
-                any(
-                    "問題" in analysis
-                    for _, _, analysis in [
-                        (a.get("file"), a.get("repo"), a.get("analysis"))
-                        for a in code_analyses
-                    ]
-                )
-                and any(
-                    term in analysis_text.lower()
-                    for term in [
-                        "修正",
-                        "対応",
-                        "改善",
-                        "必要",
-                        "should",
-                        "must",
-                        "fix",
-                        "improve",
-                    ]
-                )
+                any("問題" in a.get("analysis") for a in code_analyses)
+                and _ACTION_TERM_RE.search(analysis_text) is not None
             )
 
             # 状態を更新
@@ -250,7 +246,7 @@ class GitHubResearchAgent:
             return state_update
 
         except Exception as e:
-            logger.error(f"GitHubリサーチエージェント処理エラー: {str(e)}")
+            logger.error("GitHubリサーチエージェント処理エラー: %s", e)
 
             # エラー時の状態更新
             return {
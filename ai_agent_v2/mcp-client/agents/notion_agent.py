@@ -5,19 +5,24 @@ GitHubリサーチ結果に基づいてNotionにタスクを作成するエー
 LangGraphフレームワークに対応
 """
 
-import json
 import logging
 import re
-from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
 from config import get_agent_prompts
+from core.utils import due_date_from_today, iter_json_array, parse_tool_json
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 from tools.handlers import ToolManager
 
 logger = logging.getLogger(__name__)
 
+# タスク管理用とみなすNotionデータベースのタイトルのキーワード
+_TASK_DB_TITLE_RE = re.compile("task|タスク|project|プロジェクト|todo", re.IGNORECASE)
+
+# LLMが生成したタスク説明から優先度を抽出
+_PRIORITY_RE = re.compile(r"優先度[：:]\s*([高中低]|high|medium|low)", re.IGNORECASE)
+
 
 class NotionTaskAgent:
     """
@@ -42,6 +47,9 @@ class NotionTaskAgent:
         self.llm = llm
         self.tool_manager = tool_manager
         self.prompts = get_agent_prompts()
+        self.system_message = SystemMessage(
+            content=self.prompts.get("notion_task", "")
+        )
 
     async def _find_database_id(self) -> Optional[str]:
         """
@@ -51,8 +59,7 @@ class NotionTaskAgent:
             Optional[str]: 見つかったデータベースID、見つからない場合はNone
         """
         try:
-            tools = await self.tool_manager.list_available_tools()
-            tool_names = [tool.name for tool in tools]
+            tool_names = await self.tool_manager.available_tool_names()
 
             if "notion_list_databases" not in tool_names:
                 logger.warning("notion_list_databasesツールが利用できません")
@@ -62,32 +69,17 @@ class NotionTaskAgent:
                 "notion_list_databases", {}
             )
 
+            # 見つかった時点で打ち切り、残りのデータベース一覧はパースしない
             try:
-                if isinstance(
-                    databases_info, str
-                ) and databases_info.strip().startswith("{"):
-                    databases = json.loads(databases_info)
-
-                    for db in databases.get("results", []):
-                        db_title = db.get("title", "").lower()
-                        if any(
-                            keyword in db_title
-                            for keyword in [
-                                "task",
-                                "タスク",
-                                "project",
-                                "プロジェクト",
-                                "todo",
-                                "タスク",
-                            ]
-                        ):
-                            return db.get("id")
-            except (json.JSONDecodeError, AttributeError) as e:
-                logger.error(f"データベース情報のパースエラー: {str(e)}")
+                for db in iter_json_array(databases_info, "results"):
+                    if _TASK_DB_TITLE_RE.search(db.get("title", "")):
+                        return db.get("id")
+            except AttributeError as e:
+                logger.error("データベース情報のパースエラー: %s", e)
 
             return None
         except Exception as e:
-            logger.error(f"データベースID検索エラー: {str(e)}")
+            logger.error("データベースID検索エラー: %s", e)
             return None
 
     async def _generate_task_content(
@@ -133,11 +125,10 @@ class NotionTaskAgent:
             issue_summary.extend([line[2:].strip() for line in issue_lines])
 
         # LLMを使用してタスク内容を生成
-        notion_prompt = self.prompts.get("notion_task", "")
         combined_info = "\n\n".join(raw_info[:3]) if raw_info else summary
 
         messages = [
-            SystemMessage(content=notion_prompt),
+            self.system_message,
             HumanMessage(
                 content=f"GitHubリサーチ結果に基づいて、Notionに作成するタスクの内容を生成してください。\n\nユーザークエリ: {query}\n\n"
                 f"対象ファイル: {', '.join(file_paths) if file_paths else '未特定'}\n\n"
@@ -152,9 +143,7 @@ class NotionTaskAgent:
 
         # 優先度を抽出（デフォルトは中）
         priority = "中"
-        priority_match = re.search(
-            r"優先度[：:]\s*([高中低]|high|medium|low)", task_description, re.IGNORECASE
-        )
+        priority_match = _PRIORITY_RE.search(task_description)
         if priority_match:
             extracted_priority = priority_match.group(1).lower()
             if extracted_priority in ["高", "high"]:
@@ -163,7 +152,7 @@ class NotionTaskAgent:
                 priority = "低"
 
         # 期限の設定（1週間後）
-        due_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
+        due_date = due_date_from_today(7)
 
         return {
             "title": task_title,
@@ -203,8 +192,7 @@ class NotionTaskAgent:
                 }
 
             # ツールの利用可能性を確認
-            tools = await self.tool_manager.list_available_tools()
-            tool_names = [tool.name for tool in tools]
+            tool_names = await self.tool_manager.available_tool_names()
 
             if "notion_create_page" not in tool_names:
                 logger.warning("notion_create_pageツールが利用できません")
@@ -274,11 +262,9 @@ class NotionTaskAgent:
             # ページURLを抽出
             page_url = None
             try:
-                response_data = (
-                    json.loads(result) if isinstance(result, str) else result
-                )
+                response_data = parse_tool_json(result)
                 page_url = response_data.get("url")
-            except (json.JSONDecodeError, AttributeError):
+            except AttributeError:
                 page_url = "URL取得できませんでした"
 
             # 結果をフォーマット
@@ -297,7 +283,7 @@ class NotionTaskAgent:
             return {"notion_result": notion_result, "response": response}
 
         except Exception as e:
-            logger.error(f"Notionタスクエージェント処理エラー: {str(e)}")
+            logger.error("Notionタスクエージェント処理エラー: %s", e)
 
             # エラー時の状態更新
             return {
@@ -6,15 +6,23 @@ LangGraphフレームワークに対応
 """
 
 import logging
+import re
+from itertools import islice
 from typing import Any, Dict, Optional
 
 from config import get_agent_prompts
+from core.utils import iter_paragraphs
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 from tools.handlers import ToolManager
 
 logger = logging.getLogger(__name__)
 
+# 長い内容を要約する際に残す重要なセクションのキーワード
+_IMPORTANT_SECTION_RE = re.compile(
+    "問題分析|Notionタスク|URL:|修正手順|データベース|結果|結論|まとめ"
+)
+
 
 class SlackResponseAgent:
     """
@@ -39,6 +47,9 @@ class SlackResponseAgent:
         self.llm = llm
         self.tool_manager = tool_manager
         self.prompts = get_agent_prompts()
+        self.system_message = SystemMessage(
+            content=self.prompts.get("slack_response", "")
+        )
 
     async def _summarize_content(self, content: str, max_length: int = 2000) -> str:
         """
@@ -54,41 +65,25 @@ class SlackResponseAgent:
         if len(content) <= max_length:
             return content
 
-        # 段落に分割
-        paragraphs = content.split("\n\n")
+        # 段落に分割（全段落のリストは作らず、必要な分だけ順に取り出す）
+        paragraphs = iter_paragraphs(content)
 
         # 最初の段落と重要な部分を抽出
-        summary_parts = [paragraphs[0]]
-
-        # 重要なセクションを探す
-        important_sections = []
-        for para in paragraphs:
-            if any(
-                keyword in para
-                for keyword in [
-                    "問題分析",
-                    "Notionタスク",
-                    "URL:",
-                    "修正手順",
-                    "データベース",
-                    "結果",
-                    "結論",
-                    "まとめ",
-                ]
-            ):
-                important_sections.append(para)
-
-        # 重要なセクションを最大3つまで追加
-        summary_parts.extend(important_sections[:3])
+        summary_parts = [next(paragraphs)]
+
+        # 重要なセクションを最大3つまで追加（3つ見つかった時点で走査を打ち切る）
+        important_sections = (
+            para for para in paragraphs if _IMPORTANT_SECTION_RE.search(para)
+        )
+        summary_parts.extend(islice(important_sections, 3))
 
         # 要約を作成
         summarized_content = "\n\n".join(summary_parts)
 
         # それでも長い場合はLLMで要約
         if len(summarized_content) > max_length:
-            slack_prompt = self.prompts.get("slack_response", "")
             messages = [
-                SystemMessage(content=slack_prompt),
+                self.system_message,
                 HumanMessage(
                     content=f"次の文章を{max_length}文字以内に要約してください。重要なポイントを保持し、専門用語をわかりやすく説明してください。\n\n{content}"
                 ),
@@ -127,9 +122,6 @@ class SlackResponseAgent:
         if response:
             return response
 
-        # LLMで応答を生成
-        slack_prompt = self.prompts.get("slack_response", "")
-
         # 情報を整理
         context_info = [f"ユーザークエリ: {query}", f"クエリタイプ: {query_type}"]
 
@@ -151,7 +143,7 @@ class SlackResponseAgent:
 
         # LLMで応答を生成
         messages = [
-            SystemMessage(content=slack_prompt),
+            self.system_message,
             HumanMessage(
                 content=f"次の情報を基に、非技術者にもわかりやすい応答を作成してください。重要なポイントを簡潔にまとめ、専門用語は平易な言葉で説明してください。\n\n{' '.join(context_info)}"
             ),
@@ -185,8 +177,7 @@ class SlackResponseAgent:
 
             # Slackに送信
             if self.tool_manager and thread_ts and user_id:
-                tools = await self.tool_manager.list_available_tools()
-                tool_names = [tool.name for tool in tools]
+                tool_names = await self.tool_manager.available_tool_names()
 
                 # ユーザーメンションを追加
                 user_mention = f"<@{user_id}>"
@@ -215,7 +206,7 @@ class SlackResponseAgent:
             return {"response": final_response}
 
         except Exception as e:
-            logger.error(f"Slack応答エージェント処理エラー: {str(e)}")
+            logger.error("Slack応答エージェント処理エラー: %s", e)
 
             # エラー時の状態更新
             return {"response": f"応答の処理中にエラーが発生しました: {str(e)}"}
@@ -10,10 +10,26 @@ LangGraphを使用したマルチエージェントシステムに対応
 
 import argparse
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+import re
+import sys
+import threading
 from enum import Enum
+from typing import AsyncIterator
+
+from config import (
+    CONVERSATION_HISTORY_LIMIT,
+    LOG_LEVEL,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+    list_server_names,
+)
 
 # Core modules
+from core.cache import ResponseCache
 from core.graph import GraphManager
 from core.session import SessionManager
 from database.agent import DatabaseQueryAgent
@@ -24,22 +40,74 @@ from database.connection import DatabaseConnection
 # LangChain dependencies
 from langchain_core.messages import AIMessage, HumanMessage
 
-# Model handlers
-from models.anthropic import AnthropicModelHandler
-from models.gemini import GeminiModelHandler
-
 # Services
 from services.github import GitHubService
 from services.notion import NotionService
 from services.slack import SlackService
-from tools.handlers import ToolManager
+from tools.handlers import ToolManager, track_command_tools
 
 # ロギング設定
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# ログの出力はQueueListenerのスレッドで行い、イベントループを標準出力への書き込みで止めない
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# 書式はリスナー側で適用するため、キューにはメッセージ本文のみを渡す
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=LOG_LEVEL, handlers=[_log_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# クエリ中で言及されているサービス名（グループ名がサービス）
+# 大文字小文字を区別せずに照合し、クエリを小文字化したコピーを作らない
+_SERVICE_NAME_RE = re.compile(
+    "(?P<github>github)|(?P<slack>slack)|(?P<notion>notion)",
+    re.IGNORECASE | re.ASCII,
 )
 
 
+def _read_stdin_line() -> asyncio.Future:
+    """
+    標準入力から1行を読み取るデーモンスレッドを開始し、その結果を受け取るFutureを返す
+
+    asyncio.to_threadで読み取ると、終了時に入力待ちのスレッドをイベントループが
+    待ち続けてしまうため、終了を妨げないデーモンスレッドで読み取ります
+
+    Returns:
+        asyncio.Future: 読み取った行（EOFの場合は空文字列）を結果とするFuture
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def set_result(line):
+        # 読み取り中に中止された場合は結果を捨てる
+        if not future.done():
+            future.set_result(line)
+
+    def set_exception(error):
+        if not future.done():
+            future.set_exception(error)
+
+    def read():
+        try:
+            line = sys.stdin.readline()
+        except Exception as e:
+            callback, value = set_exception, e
+        else:
+            callback, value = set_result, line
+        try:
+            loop.call_soon_threadsafe(callback, value)
+        except RuntimeError:
+            # イベントループが既に閉じられている（終了処理中）
+            pass
+
+    threading.Thread(target=read, daemon=True).start()
+    return future
+
+
 class ConnectionMode(Enum):
     """接続モードを定義する列挙型"""
 
@@ -107,6 +175,9 @@ class MCPClient:
         # 会話履歴の追跡用（LangChain対応）
         self.conversation_history = []
 
+        # 繰り返しのクエリに対する応答キャッシュ
+        self.response_cache = ResponseCache(RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIZE)
+
         # DB関連の初期化
         self.db_connection = DatabaseConnection()
         self.db_agent = None
@@ -114,13 +185,21 @@ class MCPClient:
         # LangGraph関連の初期化
         self.graph_manager = None
 
+        # LLMへの接続を事前に確立するバックグラウンドタスク（一度だけ開始する）
+        self._warm_up_task = None
+
         # モデルハンドラーを初期化
+        # （選択したプロバイダーのSDKだけを読み込み、起動時間を短縮する）
         if self.model_provider == "anthropic":
+            from models.anthropic import AnthropicModelHandler
+
             self.anthropic_handler = AnthropicModelHandler()
             self.gemini_handler = None
             print("LangChain対応のAnthropicモデルハンドラーを初期化しました")
         else:
             # Default to Gemini
+            from models.gemini import GeminiModelHandler
+
             self.gemini_handler = GeminiModelHandler()
             self.anthropic_handler = None
             print("LangChain対応のGeminiモデルハンドラーを初期化しました")
@@ -155,7 +234,7 @@ class MCPClient:
             logging.info("データベース機能が初期化されました")
             return True
         except Exception as e:
-            logging.error(f"データベース初期化エラー: {str(e)}")
+            logging.error("データベース初期化エラー: %s", e)
             return False
 
     async def initialize_graph_manager(self):
@@ -181,7 +260,7 @@ class MCPClient:
             logging.info("LangGraphマネージャーが初期化されました")
             return True
         except Exception as e:
-            logging.error(f"LangGraphマネージャー初期化エラー: {str(e)}")
+            logging.error("LangGraphマネージャー初期化エラー: %s", e)
             return False
 
     async def connect_to_server(
@@ -209,9 +288,28 @@ class MCPClient:
         else:
             raise ValueError("Must provide either server_name or server_script_path")
 
+        self._init_tool_services(tools)
+
+        # LangGraphモードの場合はグラフマネージャーを初期化
+        if self.operation_mode == OperationMode.LANGGRAPH:
+            await self.initialize_graph_manager()
+
+        # 初回クエリに備えてLLMへの接続を事前に確立（起動を待たせないようバックグラウンドで実行）
+        self.warm_up_model()
+
+    def _init_tool_services(self, tools):
+        """
+        現在のサーバーセッションに対応するツールマネージャーとサービスを初期化
+
+        Args:
+            tools: 接続時に取得したツールリスト
+        """
         # Initialize tool manager
+        # 接続時に取得したツールリストを渡し、クエリごとの再取得を省く
         self.tool_manager = ToolManager(
-            self.session_manager.session, self.session_manager.default_channel_id
+            self.session_manager.session,
+            self.session_manager.default_channel_id,
+            tools=tools,
         )
 
         # Initialize services
@@ -221,9 +319,18 @@ class MCPClient:
             self.tool_manager, self.session_manager.default_channel_id
         )
 
-        # LangGraphモードの場合はグラフマネージャーを初期化
-        if self.operation_mode == OperationMode.LANGGRAPH:
-            await self.initialize_graph_manager()
+    def warm_up_model(self):
+        """使用するLLMプロバイダーへの接続の事前確立を、バックグラウンドで一度だけ開始"""
+        if self._warm_up_task is not None:
+            return
+
+        handler = (
+            self.anthropic_handler
+            if self.model_provider == "anthropic"
+            else self.gemini_handler
+        )
+        # タスクが途中で破棄されないよう参照を保持する
+        self._warm_up_task = asyncio.create_task(handler.warm_up())
 
     async def process_query(
         self, query: str, thread_ts: str = None, user_id: str = None
@@ -244,12 +351,218 @@ class MCPClient:
         # 会話履歴に追加
         self.conversation_history.append(HumanMessage(content=query))
 
-        # LangGraphモードで処理
+        # Slackのスレッドへの返信を伴うクエリはキャッシュを使わない
+        # （キャッシュした応答を返すと返信が投稿されないため）
+        use_cache = not (thread_ts or user_id)
+
+        # 同じクエリへの応答がキャッシュにあれば再利用
+        cached = self._use_cached_response(query) if use_cache else None
+        if cached is not None:
+            return cached
+
+        tool_manager = self.tool_manager
+        # 書き込み系ツールの実行はこのクエリの処理に限って記録する
+        # （ToolManagerは共有されるため、並行するクエリの記録と混ざらないようにする）
+        command_tools = track_command_tools()
+
         if self.operation_mode == OperationMode.LANGGRAPH:
-            return await self._process_query_with_langgraph(query, thread_ts, user_id)
+            # LangGraphモードで処理
+            response = await self._process_query_with_langgraph(
+                query, thread_ts, user_id
+            )
+        else:
+            # LangChainモードで処理
+            response = await self._process_query_with_langchain(
+                query, thread_ts, user_id
+            )
+
+        # 参照系の処理だけで完結した応答のみキャッシュ
+        # （サーバーを切り替えた場合や書き込み系ツールを使った場合は除外）
+        # 複数サーバー間の操作は専用のToolManagerでNotionやSlackに書き込むため、
+        # 常にキャッシュしない（キャッシュすると再実行時に書き込みが行われない）
+        cacheable = (
+            use_cache
+            and self.tool_manager is tool_manager
+            and not command_tools.used
+            and not self._runs_cross_server_query(query)
+        )
+        self._record_response(query, response, cacheable)
 
-        # LangChainモードで処理
-        return await self._process_query_with_langchain(query, thread_ts, user_id)
+        return response
+
+    async def stream_query(
+        self, query: str, thread_ts: str = None, user_id: str = None
+    ) -> AsyncIterator[str]:
+        """
+        ユーザークエリを処理し、応答を生成されたそばから順に返す
+
+        LangChainモードではモデルの出力やデータベースクエリの結果の説明を
+        ストリーミングし、応答全体の完了を待たずに表示を始められるようにします。
+        複数サーバーの連携を伴う場合はprocess_queryの応答をまとめて返します。
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+            thread_ts: メッセージのスレッドタイムスタンプ（スレッド返信の場合）
+            user_id: ユーザーID（メンション付き返信の場合）
+
+        Yields:
+            str: 応答の断片
+        """
+        full_mode = self.connection_mode != ConnectionMode.SIMPLE
+
+        # 複数サーバーの連携を伴う処理はストリーミングしない
+        if self.operation_mode != OperationMode.LANGCHAIN or (
+            full_mode and self._is_cross_server_query(query)
+        ):
+            yield await self.process_query(query, thread_ts, user_id)
+            return
+
+        # 会話履歴に追加
+        self.conversation_history.append(HumanMessage(content=query))
+
+        # Slackのスレッドへの返信を伴うクエリはキャッシュを使わない
+        use_cache = not (thread_ts or user_id)
+
+        # 同じクエリへの応答がキャッシュにあれば再利用
+        cached = self._use_cached_response(query) if use_cache else None
+        if cached is not None:
+            yield cached
+            return
+
+        # データベースクエリであれば、SQLの実行後に説明をストリーミング
+        if self.db_agent and await self._is_database_query(query):
+            chunks = []
+            async for chunk in self._stream_database_query(query):
+                chunks.append(chunk)
+                yield chunk
+            self._record_response(query, "".join(chunks), use_cache)
+            return
+
+        handler = (
+            self.anthropic_handler
+            if self.model_provider == "anthropic"
+            else self.gemini_handler
+        )
+        if full_mode:
+            tool_manager = self.tool_manager
+            command_tools = track_command_tools()
+            tools = await tool_manager.list_available_tools()
+            stream = handler.stream_query(query, tools, tool_manager.execute_tool)
+        else:
+            stream = handler.stream_query_simple(query)
+
+        chunks = []
+        async for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        response = "".join(chunks)
+
+        if full_mode:
+            # If we have thread_ts and user_id, it's a Slack message we should reply to
+            if thread_ts and user_id and self.session_manager.current_server == "slack":
+                await self.slack_service.reply_to_slack_thread(
+                    response, thread_ts, user_id
+                )
+            cacheable = use_cache and not command_tools.used
+        else:
+            cacheable = use_cache
+
+        self._record_response(query, response, cacheable)
+
+    async def _is_database_query(self, query: str) -> bool:
+        """
+        データベースクエリかどうかを判断（判断に失敗した場合は標準の処理に戻す）
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+
+        Returns:
+            bool: データベースクエリと判断された場合はTrue
+        """
+        try:
+            is_db_query = await self.db_agent.is_database_query(query)
+        except Exception as e:
+            logging.error("データベースクエリ処理エラー: %s", e)
+            return False
+
+        if is_db_query:
+            logging.info("データベースクエリと判断されました: %s", query)
+        return is_db_query
+
+    async def _stream_database_query(self, query: str) -> AsyncIterator[str]:
+        """
+        データベースクエリを処理し、結果の説明を生成されたそばから順に返す
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+
+        Yields:
+            str: 応答の断片
+        """
+        async for event in self.db_agent.stream_query(query):
+            if event["type"] == "explanation_chunk":
+                yield event["text"]
+            elif event["type"] == "error":
+                yield f"データベースクエリ処理中にエラーが発生しました: {event['error']}"
+
+    def _use_cached_response(self, query: str):
+        """
+        キャッシュされた応答があれば会話履歴に追加して返す
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+
+        Returns:
+            Optional[str]: キャッシュされた応答（なければNone）
+        """
+        cached = self.response_cache.get(self._response_cache_key(query))
+        if cached is not None:
+            logging.info("キャッシュされた応答を返します: %s", query)
+            self.conversation_history.append(AIMessage(content=cached))
+            self._trim_conversation_history()
+        return cached
+
+    def _record_response(self, query: str, response: str, cacheable: bool):
+        """
+        応答を会話履歴に追加し、必要に応じてキャッシュに保存
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+            response: 生成された応答
+            cacheable: 副作用がなくキャッシュしてよい応答かどうか
+        """
+        # 応答を会話履歴に追加（1クエリにつき1回）
+        self.conversation_history.append(AIMessage(content=response))
+        self._trim_conversation_history()
+
+        if cacheable and "エラー" not in response:
+            self.response_cache.set(self._response_cache_key(query), response)
+
+    def _response_cache_key(self, query: str) -> str:
+        """
+        応答キャッシュのキーを作成
+
+        接続先のサーバーによって使えるツールが異なるため、
+        現在のサーバー名をクエリと組み合わせてキーにします。
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+
+        Returns:
+            str: キャッシュキー
+        """
+        return f"{self.session_manager.current_server}:{query}"
+
+    def _trim_conversation_history(self):
+        """
+        会話履歴を上限以内に収める
+
+        会話履歴はモデルへのプロンプトには含めないため、要約はせず、
+        上限を超えた古いメッセージを破棄して履歴が際限なく増えないようにします。
+        """
+        overflow = len(self.conversation_history) - CONVERSATION_HISTORY_LIMIT
+        if overflow > 0:
+            del self.conversation_history[:overflow]
 
     async def _process_query_with_langgraph(
         self, query: str, thread_ts: str = None, user_id: str = None
@@ -267,7 +580,7 @@ class MCPClient:
         Returns:
             str: マルチエージェントシステムによって生成された応答
         """
-        logging.info(f"LangGraphモードでクエリを処理: {query}")
+        logging.info("LangGraphモードでクエリを処理: %s", query)
 
         # グラフマネージャーがない場合は初期化
         if not self.graph_manager:
@@ -277,12 +590,7 @@ class MCPClient:
         result = await self.graph_manager.process_query(query, user_id, thread_ts)
 
         # 結果から応答を取得
-        response = result.get("response", "応答が生成されませんでした")
-
-        # 応答を会話履歴に追加
-        self.conversation_history.append(AIMessage(content=response))
-
-        return response
+        return result.get("response", "応答が生成されませんでした")
 
     async def _process_query_with_langchain(
         self, query: str, thread_ts: str = None, user_id: str = None
@@ -300,7 +608,7 @@ class MCPClient:
         Returns:
             str: LangChainモデルによって生成された応答
         """
-        logging.info(f"LangChainモードでクエリを処理: {query}")
+        logging.info("LangChainモードでクエリを処理: %s", query)
 
         # データベースクエリの検出と処理
         if self.db_agent:
@@ -309,7 +617,7 @@ class MCPClient:
                 is_db_query = await self.db_agent.is_database_query(query)
 
                 if is_db_query:
-                    logging.info(f"データベースクエリと判断されました: {query}")
+                    logging.info("データベースクエリと判断されました: %s", query)
 
                     # データベースクエリを処理
                     db_result = await self.db_agent.process_query(query)
@@ -323,57 +631,35 @@ class MCPClient:
                         else:
                             result = f"クエリの結果: {db_result['raw_result']}"
 
-                    # 応答を会話履歴に追加
-                    self.conversation_history.append(AIMessage(content=result))
                     return result
             except Exception as e:
-                logging.error(f"データベースクエリ処理エラー: {str(e)}")
+                logging.error("データベースクエリ処理エラー: %s", e)
                 # エラーが発生した場合は標準の処理に戻る
 
         # 簡易モードの場合はツールなしで直接モデルで処理
         if self.connection_mode == ConnectionMode.SIMPLE:
             if self.model_provider == "anthropic":
                 # 簡易モードでのAnthropicの処理（LangChain経由）
-                result = await self.anthropic_handler.process_query_simple(query)
-                # 応答を会話履歴に追加
-                self.conversation_history.append(AIMessage(content=result))
-                return result
+                return await self.anthropic_handler.process_query_simple(query)
             else:
                 # 簡易モードでのGeminiの処理（LangChain経由）
-                result = await self.gemini_handler.process_query_simple(query)
-                # 応答を会話履歴に追加
-                self.conversation_history.append(AIMessage(content=result))
-                return result
+                return await self.gemini_handler.process_query_simple(query)
 
         # 完全モードでの処理 (MCPサーバー接続)
         # Get available tools in JSON Schema format
         tools = await self.tool_manager.list_available_tools()
 
         # Add logic to handle multi-server operations
-        if (
-            ("github" in query.lower() and "slack" in query.lower())
-            or ("github" in query.lower() and "notion" in query.lower())
-            or ("コード検索" in query and "タスク" in query)
-            or ("問題" in query and "修正" in query)
-        ):
+        if self._is_cross_server_query(query):
             # This might be a cross-server operation
-            result = await self._process_cross_server_query(query, thread_ts, user_id)
-            # 応答を会話履歴に追加
-            self.conversation_history.append(AIMessage(content=result))
-            return result
+            return await self._process_cross_server_query(query, thread_ts, user_id)
         elif self.model_provider == "anthropic":
             # Process with Anthropic (Claude) using LangChain
-            async def tool_executor(tool_name, tool_args):
-                return await self.tool_manager.execute_tool(tool_name, tool_args)
-
-            # LangChain経由でAnthropicの処理
+            # （毎回同じ実行関数を渡し、ハンドラー側で変換済みのツールを再利用させる）
             result = await self.anthropic_handler.process_query(
-                query, tools, tool_executor
+                query, tools, self.tool_manager.execute_tool
             )
 
-            # 応答を会話履歴に追加
-            self.conversation_history.append(AIMessage(content=result))
-
             # If we have thread_ts and user_id, it's a Slack message we should reply to
             if thread_ts and user_id and self.session_manager.current_server == "slack":
                 await self.slack_service.reply_to_slack_thread(
@@ -383,17 +669,13 @@ class MCPClient:
             return result
         else:
             # Process with Gemini using LangChain
-            async def tool_executor(tool_name, tool_args):
-                return await self.tool_manager.execute_tool(tool_name, tool_args)
-
-            # LangChain経由でGeminiの処理
             result = await self.gemini_handler.process_query(
-                query, tools, tool_executor, self.session_manager.default_channel_id
+                query,
+                tools,
+                self.tool_manager.execute_tool,
+                self.session_manager.default_channel_id,
             )
 
-            # 応答を会話履歴に追加
-            self.conversation_history.append(AIMessage(content=result))
-
             # If we have thread_ts and user_id, it's a Slack message we should reply to
             if thread_ts and user_id and self.session_manager.current_server == "slack":
                 await self.slack_service.reply_to_slack_thread(
@@ -402,6 +684,40 @@ class MCPClient:
 
             return result
 
+    def _runs_cross_server_query(self, query: str) -> bool:
+        """
+        クエリが_process_cross_server_queryで処理されるかどうかを判定
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+
+        Returns:
+            bool: LangChainの完全モードで複数サーバー間の操作として処理される場合はTrue
+        """
+        return (
+            self.operation_mode == OperationMode.LANGCHAIN
+            and self.connection_mode != ConnectionMode.SIMPLE
+            and self._is_cross_server_query(query)
+        )
+
+    @staticmethod
+    def _is_cross_server_query(query: str) -> bool:
+        """
+        複数のMCPサーバーにまたがる操作が必要なクエリかどうかを判定
+
+        Args:
+            query: ユーザーから入力されたクエリ文字列
+
+        Returns:
+            bool: GitHub・Notion・Slackを連携させる操作と思われる場合はTrue
+        """
+        services = {match.lastgroup for match in _SERVICE_NAME_RE.finditer(query)}
+        return (
+            ("github" in services and ("slack" in services or "notion" in services))
+            or ("コード検索" in query and "タスク" in query)
+            or ("問題" in query and "修正" in query)
+        )
+
     async def _process_cross_server_query(
         self, query: str, thread_ts: str = None, user_id: str = None
     ) -> str:
@@ -430,11 +746,33 @@ class MCPClient:
             # Step 1: Connect to GitHub
             result_text.append("GitHubサーバーに接続中...")
             try:
-                await self.connect_to_server(server_name="github")
+                # 各サーバーのツールを1つのToolManagerに登録し、ツール名で実行先を振り分ける
+                # （サーバーを切り替えるたびにツールマネージャーやサービスを作り直さない）
+                sessions = self.session_manager.sessions
+                github_tools = await self.session_manager.connect_to_server_by_name(
+                    "github"
+                )
+                router = ToolManager(sessions["github"], tools=[])
+                router.register_server_tools(sessions["github"], github_tools)
                 result_text.append("GitHub接続成功")
 
                 # Step 2: Get GitHub information & analyze code issues
-                github_info = await self.github_service.extract_github_info(query)
+                # GitHubの情報取得と並行して、投稿先のSlackサーバーへ接続しておく
+                # タスク作成の要否はGitHubの情報取得後にしか分からないため、
+                # Notionサーバーへの接続も先に始めておく（現在のサーバーは切り替えない）
+                result_text.append("Slackサーバーに接続中...")
+                github_info, slack_tools, _ = await asyncio.gather(
+                    GitHubService(router).extract_github_info(query),
+                    self.session_manager.connect_to_server_by_name("slack"),
+                    self.session_manager.connect_to_servers(["notion"]),
+                )
+                # 並行する接続処理が現在のサーバーを切り替えても影響を受けないよう、
+                # ツールとチャンネルIDはサーバー名で明示的に取得する
+                router.register_server_tools(sessions["slack"], slack_tools)
+                router.default_channel_id = self.session_manager.server_channel_ids[
+                    "slack"
+                ]
+                result_text.append("Slack接続成功")
                 result_text.append(f"GitHub情報取得: {github_info}")
 
                 # Check if code issues were found that need tasks
@@ -447,25 +785,27 @@ class MCPClient:
 
                 # Step 3: Connect to Notion if we need to create tasks
                 if need_task_creation:
-                    await self.cleanup()  # Close GitHub connection
                     result_text.append("Notionサーバーに接続中...")
-                    await self.connect_to_server(server_name="notion")
+                    # 先行して始めた接続に失敗していた場合のみ接続し直す
+                    # （現在のサーバーは切り替えない）
+                    await self.session_manager.connect_to_servers(["notion"])
+                    if "notion" not in sessions:
+                        raise RuntimeError("Notionサーバーに接続できませんでした")
+                    router.register_server_tools(
+                        sessions["notion"], self.session_manager.server_tools["notion"]
+                    )
                     result_text.append("Notion接続成功")
 
                     # Create task in Notion
-                    notion_task_info = await self.notion_service.create_notion_task(
+                    notion_task_info = await NotionService(router).create_notion_task(
                         github_info, query
                     )
                     result_text.append(f"Notionタスク作成結果: {notion_task_info}")
 
-                # Step 4: Reconnect to Slack to post the summary
-                await self.cleanup()  # Close current connection
-                result_text.append("Slackサーバーに接続中...")
-                await self.connect_to_server(server_name="slack")
-                result_text.append("Slack接続成功")
+                # Step 4: Post to Slack with combined info
+                if router.default_channel_id:
+                    slack_service = SlackService(router, router.default_channel_id)
 
-                # Step 5: Post to Slack with combined info
-                if self.session_manager.default_channel_id:
                     # Prepare summary message including GitHub findings and Notion task if created
                     summary = f"GitHubコード分析結果:\n{github_info}"
                     if notion_task_info:
@@ -473,13 +813,13 @@ class MCPClient:
 
                     # If we have thread info, reply to thread
                     if thread_ts and user_id:
-                        post_result = await self.slack_service.reply_to_slack_thread(
+                        post_result = await slack_service.reply_to_slack_thread(
                             summary, thread_ts, user_id
                         )
                         result_text.append(f"Slackスレッドへの返信結果: {post_result}")
                     else:
                         # Otherwise post as a new message
-                        post_result = await self.slack_service.post_to_slack(summary)
+                        post_result = await slack_service.post_to_slack(summary)
                         result_text.append(f"Slack投稿結果: {post_result}")
                 else:
                     result_text.append(
@@ -489,11 +829,13 @@ class MCPClient:
             except Exception as e:
                 result_text.append(f"エラー発生: {str(e)}")
 
-            # Reconnect to original server if needed
-            if original_server != self.session_manager.current_server:
-                await self.cleanup()
-                if original_server:
-                    await self.connect_to_server(server_name=original_server)
+            # Switch back to the original server (its session is still open)
+            if (
+                original_server
+                and original_server != self.session_manager.current_server
+            ):
+                tools = self.session_manager.use_server(original_server)
+                await self.session_manager.prepare_langchain_tools(tools)
 
             return "\n".join(result_text)
         except Exception as e:
@@ -513,29 +855,61 @@ class MCPClient:
         Returns:
             None
         """
-        print("\nMCP Client Started!")
-        print("Type your queries or 'quit' to exit.")
-        print(f"Using model provider: {self.model_provider}")
-        print(f"Connection mode: {self.connection_mode.value}")
-        print(f"Operation mode: {self.operation_mode.value}")
+        banner = [
+            "\nMCP Client Started!",
+            "Type your queries or 'quit' to exit.",
+            f"Using model provider: {self.model_provider}",
+            f"Connection mode: {self.connection_mode.value}",
+            f"Operation mode: {self.operation_mode.value}",
+        ]
 
         # 簡易モードの場合は追加の情報を表示
         if self.connection_mode == ConnectionMode.SIMPLE:
-            print("Running in SIMPLE mode - direct model access without MCP tools")
+            banner.append(
+                "Running in SIMPLE mode - direct model access without MCP tools"
+            )
         else:
-            print("Running in FULL mode - connected to MCP server with tools")
+            banner.append("Running in FULL mode - connected to MCP server with tools")
             if self.session_manager.current_server:
-                print(f"Connected to server: {self.session_manager.current_server}")
+                banner.append(
+                    f"Connected to server: {self.session_manager.current_server}"
+                )
+
+        # 起動時の表示はまとめて一度だけ書き出す
+        sys.stdout.write("\n".join(banner) + "\n")
+        sys.stdout.flush()
 
+        # 入力は別スレッドで読み取る（入力待ちの間もMCPのstdio読み取りが進む）
+        # パイプなど端末以外からの入力は、応答の生成中にも次の行の読み取りを始めておく
+        # （端末ではプロンプトを表示してから入力を受け付ける）
+        prefetch = not sys.stdin.isatty()
+        pending_line = None
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                sys.stdout.write("\nQuery: ")
+                sys.stdout.flush()
+                if pending_line is None:
+                    pending_line = _read_stdin_line()
+                line = await pending_line
+                pending_line = None
+
+                # EOF（パイプ入力の終端など）は終了として扱う
+                if not line:
+                    break
 
+                query = line.strip()
                 if query.lower() == "quit":
                     break
 
-                response = await self.process_query(query, thread_ts, user_id)
-                print("\n" + response)
+                if prefetch:
+                    pending_line = _read_stdin_line()
+
+                # 応答は届いた断片から順に表示
+                sys.stdout.write("\n")
+                async for chunk in self.stream_query(query, thread_ts, user_id):
+                    sys.stdout.write(chunk)
+                    sys.stdout.flush()
+                sys.stdout.write("\n")
 
             except Exception as e:
                 print(f"\nError: {str(e)}")
@@ -545,11 +919,15 @@ class MCPClient:
         リソースのクリーンアップ
 
         非同期リソースやセッションなどのクリーンアップを行います。
-        プログラム終了時や接続切り替え時に呼び出されます。
+        プログラム終了時に呼び出され、接続済みのすべてのサーバーを閉じます。
 
         Returns:
             None
         """
+        # 完了していないウォームアップは不要なため中止
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+
         # LangGraphリソースのクリーンアップ
         if self.graph_manager:
             await self.graph_manager.cleanup()
@@ -647,6 +1025,8 @@ async def main():
         # 接続モードに応じてサーバー接続（完全モードのみ）
         if connection_mode == ConnectionMode.FULL:
             if args.server:
+                # スキーマに定義された全サーバーへ並行して接続しておく
+                await client.session_manager.connect_to_servers(list_server_names())
                 await client.connect_to_server(server_name=args.server)
             else:
                 await client.connect_to_server(server_script_path=args.path)
@@ -7,19 +7,140 @@ LangChain関連の設定も含む
 LangGraphのマルチエージェント設定も含む
 """
 
-import json
 import os
+from dataclasses import dataclass
 from enum import Enum
-from typing import Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 from dotenv import load_dotenv
 
-# 環境変数のロード
-load_dotenv()  # load environment variables from .env
+try:
+    # orjsonがインストールされていれば高速なJSONパーサーを使用
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# 環境変数のロード（既に設定されている環境変数は上書きしない）
+load_dotenv(override=False)  # load environment variables from .env
+
+
+# データベース設定
+class DBType(Enum):
+    """サポートされているデータベースの種類"""
+
+    MYSQL = "mysql"
+    POSTGRESQL = "postgresql"
+    SQLITE = "sqlite"
+
+
+# キャッシュファイルを保存するディレクトリ
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-slack-bot")
+
+# データベーススキーマ説明のデフォルト値
+_DEFAULT_DB_SCHEMA_DESCRIPTION = """
+このデータベースには以下のテーブルがあります:
+- users: ユーザー情報を管理（id, name, email, created_at）
+- projects: プロジェクト情報を管理（id, title, description, user_id, created_at）
+- tasks: タスク情報を管理（id, title, description, status, project_id, assigned_to, created_at）
+"""
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    環境変数から読み込んだアプリケーション設定
+
+    環境変数はget_settings()の初回呼び出し時に一度だけ読み込まれます
+    """
+
+    log_level: str
+    gemini_api_key: Optional[str]
+    anthropic_api_key: Optional[str]
+    response_cache_ttl: float
+    tool_cache_ttl: float
+    tool_cache_path: str
+    mcp_tool_concurrency: int
+    llm_max_concurrency: int
+    db_type: DBType
+    db_host: str
+    db_port: str
+    db_user: str
+    db_password: str
+    db_name: str
+    db_schema_description: str
+    db_schema_cache_ttl: float
+    db_schema_cache_dir: str
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "Settings":
+        """
+        環境変数のマッピングから設定を作成
+
+        Args:
+            env: 環境変数（os.environなど）
+
+        Returns:
+            Settings: 作成された設定
+        """
+        return cls(
+            log_level=env.get("LOG_LEVEL", "INFO").upper(),
+            gemini_api_key=env.get("GEMINI_API_KEY"),
+            anthropic_api_key=env.get("ANTHROPIC_API_KEY"),
+            response_cache_ttl=float(env.get("RESPONSE_CACHE_TTL", "300")),
+            tool_cache_ttl=float(env.get("TOOL_CACHE_TTL", "300")),
+            tool_cache_path=env.get(
+                "TOOL_CACHE_PATH", os.path.join(_CACHE_DIR, "mcp.json")
+            ),
+            mcp_tool_concurrency=int(env.get("MCP_TOOL_CONCURRENCY", "8")),
+            llm_max_concurrency=int(env.get("LLM_MAX_CONCURRENCY", "16")),
+            db_type=DBType(env.get("DB_TYPE", "mysql")),
+            db_host=env.get("DB_HOST", "localhost"),
+            db_port=env.get("DB_PORT", "3306"),
+            db_user=env.get("DB_USER", "root"),
+            db_password=env.get("DB_PASSWORD", ""),
+            db_name=env.get("DB_NAME", "default_db"),
+            db_schema_description=env.get(
+                "DB_SCHEMA_DESCRIPTION", _DEFAULT_DB_SCHEMA_DESCRIPTION
+            ),
+            db_schema_cache_ttl=float(env.get("DB_SCHEMA_CACHE_TTL", "86400")),
+            db_schema_cache_dir=env.get(
+                "DB_SCHEMA_CACHE_DIR", os.path.join(_CACHE_DIR, "db_schema")
+            ),
+        )
+
+    @property
+    def db_url(self) -> str:
+        """データベース接続URL"""
+        user = f"{self.db_user}:{self.db_password}"
+        host = f"{self.db_host}:{self.db_port}"
+        return {
+            DBType.MYSQL: f"mysql+mysqlconnector://{user}@{host}/{self.db_name}",
+            DBType.POSTGRESQL: f"postgresql://{user}@{host}/{self.db_name}",
+            DBType.SQLITE: f"sqlite:///{self.db_name}",
+        }[self.db_type]
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    アプリケーション設定を取得（環境変数の読み込みは初回のみ）
+
+    Returns:
+        Settings: アプリケーション設定
+    """
+    return Settings.from_env(dict(os.environ))
+
+
+settings = get_settings()
+
+# ログレベル（DEBUGでツール呼び出しの詳細を出力）
+LOG_LEVEL = settings.log_level
 
 # モデル設定
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+GEMINI_API_KEY = settings.gemini_api_key
+ANTHROPIC_API_KEY = settings.anthropic_api_key
 
 # モデル名の定数
 ANTHROPIC_MODEL_NAME = "claude-3-5-sonnet-20241022"
@@ -39,10 +160,42 @@ GitHubリポジトリの情報や、Notionのコンテンツなど、様々な
 回答は簡潔で明確にし、必要な情報のみを提供してください。
 """
 
+# 簡易モード用のシステムプロンプト
+SIMPLE_MODE_SYSTEM_PROMPT = """あなたはSlackに接続された日本語で対応するアシスタントです。
+簡易モードで実行されているため、外部サービスへの接続はできません。
+ユーザーの質問に直接回答してください。
+日本語で丁寧に回答してください。"""
+
+# 応答キャッシュ設定
+# 同じクエリへの応答を再利用する期間（秒）。0でキャッシュを無効化
+RESPONSE_CACHE_TTL = settings.response_cache_ttl
+# キャッシュする応答の最大数
+RESPONSE_CACHE_SIZE = 128
+
+# 読み取り専用ツールの結果キャッシュ（ファイルに永続化）
+# 結果を再利用する期間（秒）。0でキャッシュを無効化
+TOOL_CACHE_TTL = settings.tool_cache_ttl
+# キャッシュファイルのパス
+TOOL_CACHE_PATH = settings.tool_cache_path
+
+# MCPツール呼び出しの同時実行数の上限
+MCP_TOOL_CONCURRENCY = settings.mcp_tool_concurrency
+
+# モデルハンドラーごとのLLMへの同時リクエスト数の上限
+LLM_MAX_CONCURRENCY = settings.llm_max_concurrency
+
+# LLMのプロンプトに含めるツール結果1件あたりの最大文字数
+TOOL_RESULT_PROMPT_CHARS = 4000
+
+# 会話履歴の設定
+# 保持するメッセージの最大数（超えた分は古いものから破棄）
+CONVERSATION_HISTORY_LIMIT = 40
+
 # LangGraph マルチエージェント設定
 # 各エージェント用のプロンプト
-AGENT_PROMPTS = {
-    "controller": """
+AGENT_PROMPTS: Mapping[str, str] = MappingProxyType(
+    {
+        "controller": """
 あなたはAIエージェントシステムのコントローラーエージェントです。
 ユーザーからのクエリを受け取り、適切なエージェントにルーティングする役割があります。
 
@@ -55,7 +208,7 @@ AGENT_PROMPTS = {
 クエリの内容を分析し、最も適切なカテゴリに分類してください。
 分類結果に基づいて、システムは適切な専門エージェントにクエリを転送します。
 """,
-    "db_query": """
+        "db_query": """
 あなたはデータベースクエリを専門とするAIエージェントです。
 ユーザーの自然言語クエリをSQLクエリに変換し、データベースに問い合わせる役割があります。
 
@@ -68,7 +221,7 @@ AGENT_PROMPTS = {
 技術的な詳細よりも、結果の意味や価値に焦点を当てて説明してください。
 ユーザーは技術者とは限らないため、わかりやすい言葉で説明することが重要です。
 """,
-    "github_research": """
+        "github_research": """
 あなたはGitHubリポジトリのコードを調査するAIエージェントです。
 コードの問題を発見し、分析する専門家としての役割があります。
 
@@ -81,7 +234,7 @@ AGENT_PROMPTS = {
 分析結果は明確かつ具体的に説明し、問題の重大度も示してください。
 コードのどの部分に問題があるのか、なぜ問題なのかを専門的な観点から説明してください。
 """,
-    "notion_task": """
+        "notion_task": """
 あなたはNotion統合を専門とするAIエージェントです。
 GitHubのコード分析結果に基づいて、Notionにタスクを作成する役割があります。
 
@@ -95,7 +248,7 @@ GitHubのコード分析結果に基づいて、Notionにタスクを作成す
 タスクは明確で実用的であり、技術的な詳細と修正の手順が含まれるようにしてください。
 また、タスクの緊急度や影響範囲も適切に示してください。
 """,
-    "slack_response": """
+        "slack_response": """
 あなたはSlackコミュニケーションを専門とするAIエージェントです。
 処理結果をわかりやすくSlackに返信する役割があります。
 
@@ -110,79 +263,99 @@ GitHubのコード分析結果に基づいて、Notionにタスクを作成す
 長文になる場合は、最初に要点をまとめ、その後で詳細を説明してください。
 ユーザーのニーズを満たす応答を心がけてください。
 """,
-}
+    }
+)
 
 
 # エージェントプロンプトの取得
-def get_agent_prompts() -> Dict[str, str]:
+def get_agent_prompts() -> Mapping[str, str]:
     """
     エージェントプロンプトを取得
 
     Returns:
-        Dict[str, str]: エージェントタイプごとのプロンプト
+        Mapping[str, str]: エージェントタイプごとのプロンプト（読み取り専用）
     """
     return AGENT_PROMPTS
 
 
-# データベース設定
-class DBType(Enum):
-    """サポートされているデータベースの種類"""
+# データベース接続情報
+DB_TYPE = settings.db_type
+DB_HOST = settings.db_host
+DB_PORT = settings.db_port
+DB_USER = settings.db_user
+DB_PASSWORD = settings.db_password
+DB_NAME = settings.db_name
 
-    MYSQL = "mysql"
-    POSTGRESQL = "postgresql"
-    SQLITE = "sqlite"
+# データベース接続URL（DB_TYPEは不正な値だとDBType()で例外になるため必ず存在する）
+DB_URL = settings.db_url
 
+# データベーススキーマ説明
+DB_SCHEMA_DESCRIPTION = settings.db_schema_description
 
-# データベース接続情報
-DB_TYPE = DBType(os.getenv("DB_TYPE", "mysql"))
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
-DB_NAME = os.getenv("DB_NAME", "default_db")
-
-
-# データベース接続URL
-def get_db_url():
-    """データベースの接続URLを取得"""
-    if DB_TYPE == DBType.MYSQL:
-        return f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    elif DB_TYPE == DBType.POSTGRESQL:
-        return f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    elif DB_TYPE == DBType.SQLITE:
-        return f"sqlite:///{DB_NAME}"
-    else:
-        raise ValueError(f"Unsupported database type: {DB_TYPE}")
+# データベースのコネクションプール設定
+# 常に保持する接続数
+DB_POOL_SIZE = 10
+# 一時的に追加で確立できる接続数
+DB_POOL_MAX_OVERFLOW = 20
+# 空き接続を待つ最大時間（秒）
+DB_POOL_TIMEOUT = 30
+# 接続を再利用する最大時間（秒）。サーバー側のタイムアウトより短くする
+DB_POOL_RECYCLE = 1800
 
+# クエリ結果の説明を生成する際、LLMに渡す最大行数
+DB_RESULT_PROMPT_ROWS = 50
 
-# データベーススキーマ説明
-DB_SCHEMA_DESCRIPTION = os.getenv(
-    "DB_SCHEMA_DESCRIPTION",
-    """
-このデータベースには以下のテーブルがあります:
-- users: ユーザー情報を管理（id, name, email, created_at）
-- projects: プロジェクト情報を管理（id, title, description, user_id, created_at）
-- tasks: タスク情報を管理（id, title, description, status, project_id, assigned_to, created_at）
-""",
-)
+# 取得したデータベーススキーマのキャッシュ（ファイルに永続化）
+# スキーマ情報を再利用する期間（秒）。0でキャッシュを無効化
+DB_SCHEMA_CACHE_TTL = settings.db_schema_cache_ttl
+# キャッシュファイルを保存するディレクトリ
+DB_SCHEMA_CACHE_DIR = settings.db_schema_cache_dir
 
 
 # サーバースキーマ関連
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), "schema")
+
+
 def get_schema_path(server_name):
     """スキーマファイルのパスを取得"""
-    schema_dir = os.path.join(os.path.dirname(__file__), "schema")
-    return os.path.join(schema_dir, f"{server_name}.json")
+    return os.path.join(SCHEMA_DIR, f"{server_name}.json")
 
 
 def load_server_schema(server_name):
-    """サーバースキーマをロード"""
+    """
+    サーバースキーマをロード
+
+    パースした結果はファイルの更新時刻ごとにキャッシュされるため、
+    ファイルが変更されない限り再読み込みしません。
+    返り値はキャッシュと共有されるため、呼び出し側で変更しないでください。
+    """
     schema_file = get_schema_path(server_name)
 
-    if not os.path.exists(schema_file):
+    try:
+        mtime = os.path.getmtime(schema_file)
+    except OSError:
         raise ValueError(f"Schema file for {server_name} not found at {schema_file}")
 
-    with open(schema_file, "r") as f:
-        return json.load(f)
+    return _load_schema_file(schema_file, mtime)
+
+
+@lru_cache(maxsize=32)
+def _load_schema_file(schema_file, mtime):
+    """スキーマファイルを読み込む（mtimeはキャッシュの無効化にのみ使用）"""
+    # バイト列のまま渡す（orjson・jsonのどちらもUTF-8のバイト列を直接パースできる）
+    with open(schema_file, "rb") as f:
+        return _json_loads(f.read())
+
+
+def list_server_names():
+    """スキーマディレクトリに定義されているサーバー名の一覧を取得"""
+    if not os.path.isdir(SCHEMA_DIR):
+        return []
+    return sorted(
+        os.path.splitext(name)[0]
+        for name in os.listdir(SCHEMA_DIR)
+        if name.endswith(".json")
+    )
 
 
 def get_server_config(schema, server_name):
@@ -4,11 +4,17 @@
 MCPクライアントの基本クラスと共通機能を提供します
 """
 
-from contextlib import AsyncExitStack
-from typing import Optional
+import asyncio
+import logging
+from functools import partial
+from typing import Dict, Optional
 
 from mcp import ClientSession, StdioServerParameters, stdio_client
 
+from .cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
 
 class BaseMCPClient:
     """
@@ -22,50 +28,205 @@ class BaseMCPClient:
         BaseMCPClientの初期化
         """
         self.session: Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
-        self.stdio = None
-        self.write = None
         self.current_server = None
         self.default_channel_id = None
 
+        # 接続済みサーバーごとのセッションと関連リソース（サーバー名をキーとする）
+        # サーバーを切り替えても接続を閉じず、再接続のコストを省きます
+        self.sessions: Dict[str, ClientSession] = {}
+        self.server_tools: Dict[str, list] = {}
+        self.server_channel_ids: Dict[str, Optional[str]] = {}
+
+        # 各サーバーとの接続を保持するタスクと、その終了を指示するイベント
+        self._server_tasks: Dict[str, asyncio.Task] = {}
+        self._server_stops: Dict[str, asyncio.Event] = {}
+
+        # 同じサーバーへの同時の接続要求は1回の接続にまとめる
+        self._server_opens = SingleFlight()
+
     async def connect_to_server(
-        self, server_params: StdioServerParameters, server_name: str
+        self,
+        server_params: StdioServerParameters,
+        server_name: str,
+        default_channel_id: Optional[str] = None,
+    ):
+        """
+        MCPサーバーに接続し、現在のサーバーとして使用
+
+        既に接続済みのサーバーであれば、新たに接続せずにそのセッションに切り替えます
+
+        Args:
+            server_params: サーバー接続パラメータ
+            server_name: 接続するサーバーの名前
+            default_channel_id: このサーバーで使用するデフォルトのSlackチャンネルID
+
+        Returns:
+            list: 利用可能なツールのリスト
+        """
+        if server_name not in self.sessions:
+            await self.open_server(server_params, server_name, default_channel_id)
+        return self.use_server(server_name)
+
+    async def open_server(
+        self,
+        server_params: StdioServerParameters,
+        server_name: str,
+        default_channel_id: Optional[str] = None,
     ):
         """
-        MCPサーバーに接続
+        MCPサーバーへの接続を確立して登録（現在のサーバーは切り替えない）
+
+        接続はサーバーごとの専用タスクが保持するため、複数のサーバーに
+        並行して接続でき、どのタスクからでもcleanupで閉じられます。
+        同じサーバーへの接続が進行中であれば新たに接続せずその完了を待ち、
+        接続済みであれば既存の接続のツールリストを返します
 
         Args:
             server_params: サーバー接続パラメータ
             server_name: 接続するサーバーの名前
+            default_channel_id: このサーバーで使用するデフォルトのSlackチャンネルID
+
+        Returns:
+            list: 利用可能なツールのリスト
         """
-        stdio_transport = await self.exit_stack.enter_async_context(
-            stdio_client(server_params)
+        if server_name in self.sessions:
+            return self.server_tools[server_name]
+
+        return await self._server_opens.run(
+            server_name,
+            lambda: self._open_server(server_params, server_name, default_channel_id),
         )
-        self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(self.stdio, self.write)
+
+    async def _open_server(
+        self,
+        server_params: StdioServerParameters,
+        server_name: str,
+        default_channel_id: Optional[str] = None,
+    ):
+        """
+        MCPサーバーへの接続を確立して登録（open_serverから1サーバーにつき同時に1回だけ呼ばれる）
+
+        Args:
+            server_params: サーバー接続パラメータ
+            server_name: 接続するサーバーの名前
+            default_channel_id: このサーバーで使用するデフォルトのSlackチャンネルID
+
+        Returns:
+            list: 利用可能なツールのリスト
+        """
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(
+            self._hold_server_connection(server_params, ready, stop),
+            name=f"mcp-server-{server_name}",
         )
 
-        await self.session.initialize()
-        self.current_server = server_name
+        try:
+            session, tools = await ready
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
 
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
         print(
-            f"\nConnected to {self.current_server} server with tools:",
+            f"\nConnected to {server_name} server with tools:",
             [tool.name for tool in tools],
         )
 
-        return response.tools
+        # 後で切り替えられるよう接続を保持
+        self.sessions[server_name] = session
+        self.server_tools[server_name] = tools
+        self.server_channel_ids[server_name] = default_channel_id
+        self._server_tasks[server_name] = task
+        self._server_stops[server_name] = stop
+
+        # 接続が終了したら（サーバープロセスの終了など）、古いセッションの登録を外す
+        task.add_done_callback(partial(self._on_server_connection_closed, server_name))
+
+        return tools
+
+    def _on_server_connection_closed(self, server_name: str, task: asyncio.Task):
+        """
+        接続を保持するタスクの終了時に、そのサーバーの登録を解除
+
+        Args:
+            server_name: 接続が終了したサーバーの名前
+            task: 終了したタスク
+        """
+        # 既に新しい接続に置き換わっている場合やcleanup済みの場合は何もしない
+        if self._server_tasks.get(server_name) is not task:
+            return
+
+        self.sessions.pop(server_name, None)
+        self.server_tools.pop(server_name, None)
+        self.server_channel_ids.pop(server_name, None)
+        self._server_tasks.pop(server_name, None)
+        self._server_stops.pop(server_name, None)
+
+        if self.current_server == server_name:
+            self.session = None
+            self.current_server = None
+            self.default_channel_id = None
+
+    @staticmethod
+    async def _hold_server_connection(
+        server_params: StdioServerParameters,
+        ready: asyncio.Future,
+        stop: asyncio.Event,
+    ):
+        """
+        MCPサーバーとの接続を確立し、終了の指示があるまで保持
+
+        Args:
+            server_params: サーバー接続パラメータ
+            ready: 接続完了時に (セッション, ツールリスト) を設定するFuture
+            stop: 接続を閉じるタイミングを通知するイベント
+        """
+        try:
+            async with stdio_client(server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+
+                    # List available tools
+                    response = await session.list_tools()
+                    ready.set_result((session, response.tools))
+
+                    await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCPサーバーとの接続が終了しました: %s", e)
+
+    def use_server(self, server_name: str):
+        """
+        接続済みのサーバーに切り替え
+
+        Args:
+            server_name: 切り替え先のサーバーの名前
+
+        Returns:
+            list: 利用可能なツールのリスト
+        """
+        self.session = self.sessions[server_name]
+        self.current_server = server_name
+        self.default_channel_id = self.server_channel_ids[server_name]
+        return self.server_tools[server_name]
 
     async def cleanup(self):
         """
         リソースのクリーンアップ
 
         非同期リソースやセッションなどのクリーンアップを行います。
+        接続済みのすべてのサーバーとの接続を閉じます。
         """
-        await self.exit_stack.aclose()
+        for stop in self._server_stops.values():
+            stop.set()
+        await asyncio.gather(*self._server_tasks.values(), return_exceptions=True)
+
+        self.sessions.clear()
+        self.server_tools.clear()
+        self.server_channel_ids.clear()
+        self._server_tasks.clear()
+        self._server_stops.clear()
         self.session = None
-        self.stdio = None
-        self.write = None
+        self.current_server = None
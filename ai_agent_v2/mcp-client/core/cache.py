@@ -0,0 +1,252 @@
+"""
+応答キャッシュモジュール
+
+同じ内容のクエリに対する応答をキャッシュし、LLMやツールの再実行を省略します
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from core.utils import json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    クエリ応答のTTL付きLRUキャッシュ
+
+    クエリは空白と大文字小文字を正規化したうえでキーとして扱います。
+    副作用のあるツールを使った応答はキャッシュしないよう、
+    保存するかどうかの判断は呼び出し側で行います。
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        """
+        ResponseCacheの初期化
+
+        Args:
+            ttl: キャッシュの有効期間（秒）。0以下の場合はキャッシュを無効化
+            max_size: 保持する応答の最大数
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        キャッシュキー用にクエリを正規化
+
+        Args:
+            query: ユーザークエリ
+
+        Returns:
+            str: 正規化されたクエリ
+        """
+        return " ".join(query.lower().split())
+
+    def get(self, query: str) -> Optional[str]:
+        """
+        キャッシュされた応答を取得
+
+        Args:
+            query: ユーザークエリ
+
+        Returns:
+            Optional[str]: 有効な応答があればその応答、なければNone
+        """
+        if self.ttl <= 0:
+            return None
+
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, response = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return response
+
+    def set(self, query: str, response: str) -> None:
+        """
+        応答をキャッシュに保存
+
+        Args:
+            query: ユーザークエリ
+            response: 保存する応答
+        """
+        if self.ttl <= 0:
+            return
+
+        key = self.normalize(query)
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """キャッシュをすべて破棄"""
+        self._entries.clear()
+
+
+class SingleFlight:
+    """
+    同じキーの処理が実行中であれば、新たに実行せずその結果を共有する
+
+    応答キャッシュに保存される前に同じクエリが同時に届いた場合でも、
+    LLMへのリクエストを1回にまとめるために使用します。
+    """
+
+    def __init__(self):
+        """SingleFlightの初期化"""
+        self._inflight = {}
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        キーごとに処理を1回だけ実行し、同時に呼び出した全員に結果を返す
+
+        Args:
+            key: 処理をまとめるためのキー
+            func: 実行する処理（コルーチンを返す引数なしの関数）
+
+        Returns:
+            Any: 処理の結果
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # 呼び出し元がキャンセルされても、結果を待つ他の呼び出し元の処理は継続する
+        return await asyncio.shield(task)
+
+
+class PersistentToolCache:
+    """
+    読み取り専用ツールの結果をJSONファイルに永続化するTTL付きキャッシュ
+
+    プロセスを再起動してもキャッシュが残るため、変更の少ない情報
+    （リポジトリ一覧など）の取得でMCPサーバーへの呼び出しを省けます。
+    書き込み系ツールの結果はキャッシュしないよう、呼び出し側で判断します。
+    """
+
+    def __init__(self, path: str, ttl: float):
+        """
+        PersistentToolCacheの初期化
+
+        Args:
+            path: キャッシュファイルのパス
+            ttl: キャッシュの有効期間（秒）。0以下の場合はキャッシュを無効化
+        """
+        self.path = path
+        self.ttl = ttl
+        self._entries = None  # 初回アクセス時にファイルから読み込む
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def make_key(tool_name: str, tool_args) -> str:
+        """
+        ツール名と引数からキャッシュキーを作成
+
+        Args:
+            tool_name: ツールの名前
+            tool_args: ツールに渡す引数
+
+        Returns:
+            str: キャッシュキー
+        """
+        args = json.dumps(tool_args, sort_keys=True, ensure_ascii=False, default=str)
+        return f"{tool_name}:{args}"
+
+    async def get(self, tool_name: str, tool_args) -> Optional[str]:
+        """
+        キャッシュされたツール結果を取得
+
+        Args:
+            tool_name: ツールの名前
+            tool_args: ツールに渡す引数
+
+        Returns:
+            Optional[str]: 有効な結果があればその結果、なければNone
+        """
+        if self.ttl <= 0:
+            return None
+
+        async with self._lock:
+            entries = await self._load()
+            entry = entries.get(self.make_key(tool_name, tool_args))
+            if entry is None:
+                return None
+
+            stored_at, result = entry
+            if time.time() - stored_at > self.ttl:
+                return None
+            return result
+
+    async def set(self, tool_name: str, tool_args, result: str) -> None:
+        """
+        ツール結果をキャッシュに保存し、ファイルに書き出す
+
+        Args:
+            tool_name: ツールの名前
+            tool_args: ツールに渡す引数
+            result: 保存するツール結果
+        """
+        if self.ttl <= 0:
+            return
+
+        async with self._lock:
+            entries = await self._load()
+            now = time.time()
+            entries[self.make_key(tool_name, tool_args)] = (now, result)
+
+            # 期限切れのエントリはファイルに書き出す前に削除
+            for key in [k for k, (t, _) in entries.items() if now - t > self.ttl]:
+                del entries[key]
+
+            await asyncio.to_thread(self._write, dict(entries))
+
+    async def _load(self) -> dict:
+        """
+        キャッシュファイルを読み込む（プロセス内で1回のみ）
+
+        Returns:
+            dict: キャッシュキー→(保存時刻, 結果) の辞書
+        """
+        if self._entries is None:
+            self._entries = await asyncio.to_thread(self._read)
+        return self._entries
+
+    def _read(self) -> dict:
+        """キャッシュファイルを読み込む（存在しない・壊れている場合は空）"""
+        try:
+            with open(self.path, "rb") as f:
+                data = json_loads(f.read())
+            return {key: tuple(entry) for key, entry in data.items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("ツール結果キャッシュを読み込めませんでした: %s", e)
+            return {}
+
+    def _write(self, entries: dict) -> None:
+        """キャッシュファイルを書き出す（一時ファイル経由で置き換え）"""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json_dumps(entries))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("ツール結果キャッシュを書き出せませんでした: %s", e)
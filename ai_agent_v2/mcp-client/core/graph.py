@@ -6,27 +6,25 @@ LangGraphを使用したAIエージェント間の状態とフローを管理し
 """
 
 import logging
+import re
 from enum import Enum
+from functools import lru_cache
 from typing import Dict, List, Literal, Optional, TypedDict
 
 from agents.db_agent import DBQueryAgent
 from agents.github_agent import GitHubResearchAgent
 from agents.notion_agent import NotionTaskAgent
 from agents.slack_agent import SlackResponseAgent
-from config import (
-    ANTHROPIC_API_KEY,
-    ANTHROPIC_MODEL_NAME,
-    MODEL_TEMPERATURE,
-    get_agent_prompts,
-)
-from langchain_anthropic import ChatAnthropic
+from config import ANTHROPIC_MODEL_NAME, get_agent_prompts
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
+from models.registry import get_llm
 
 logger = logging.getLogger(__name__)
 
 
-class AgentType(Enum):
+class AgentType(str, Enum):
     """エージェントの種類を定義する列挙型"""
 
     CONTROLLER = "controller"
@@ -36,7 +34,7 @@ class AgentType(Enum):
     SLACK_RESPONSE = "slack_response"
 
 
-class QueryType(Enum):
+class QueryType(str, Enum):
     """クエリの種類を定義する列挙型"""
 
     GENERAL = "general"
@@ -45,6 +43,52 @@ class QueryType(Enum):
     TASK_CREATION = "task_creation"
 
 
+# ルーティングで毎回参照するクエリタイプの値（Enumの属性解決を避ける）
+_GENERAL = QueryType.GENERAL.value
+_DB_QUERY = QueryType.DB_QUERY.value
+_CODE_ISSUE = QueryType.CODE_ISSUE.value
+_TASK_CREATION = QueryType.TASK_CREATION.value
+
+
+# コントローラーの応答からクエリタイプを判定するキーワード（1回の走査で全種類を検出）
+_QUERY_KEYWORD_RE = re.compile(
+    r"(?P<db>データベース|sql|クエリ)|(?P<code>github|コード|バグ)|(?P<task>タスク|notion)",
+    re.IGNORECASE,
+)
+
+
+def classify_query_type(response_text: str) -> str:
+    """
+    コントローラーの応答テキストからクエリタイプを判定
+
+    データベース関連のキーワードを最優先し、次にコード関連のキーワードを見て、
+    タスク関連のキーワードも含まれていればタスク作成と判定します
+
+    Args:
+        response_text: コントローラーエージェントのLLM応答
+
+    Returns:
+        str: クエリタイプの値
+    """
+    matched = {m.lastgroup for m in _QUERY_KEYWORD_RE.finditer(response_text)}
+
+    if "db" in matched:
+        return _DB_QUERY
+    if "code" in matched:
+        if "task" in matched:
+            return _TASK_CREATION
+        return _CODE_ISSUE
+    return _GENERAL
+
+
+# クエリタイプごとの送り先エージェント（タスク作成は状態に応じて変わるため含めない）
+_QUERY_ROUTES = {
+    _GENERAL: "slack_response",
+    _DB_QUERY: "db_query",
+    _CODE_ISSUE: "github_research",
+}
+
+
 class GraphState(TypedDict):
     """
     グラフの状態を管理するための型定義
@@ -85,25 +129,20 @@ def determine_query_type(
     """
     query_type = state.get("query_type")
 
-    if query_type == QueryType.GENERAL.value:
-        # 一般的なクエリは結果を直接返す
-        return "slack_response"
-    elif query_type == QueryType.DB_QUERY.value:
-        # データベースクエリはDBエージェントに送る
-        return "db_query"
-    elif query_type == QueryType.CODE_ISSUE.value:
-        # コード問題はGitHubリサーチエージェントに送る
-        return "github_research"
-    elif query_type == QueryType.TASK_CREATION.value:
+    # 一般的なクエリ・データベースクエリ・コード問題は固定の送り先
+    next_agent = _QUERY_ROUTES.get(query_type)
+    if next_agent is not None:
+        return next_agent
+
+    if query_type == _TASK_CREATION:
         # タスク作成はGitHubリサーチを最初に行い、その後Notionエージェントに送る
         if not state.get("github_result"):
             return "github_research"
         elif not state.get("notion_result"):
             return "notion_task"
-        return "slack_response"
-    else:
-        # デフォルトはSlack応答に送る
-        return "slack_response"
+
+    # デフォルトはSlack応答に送る
+    return "slack_response"
 
 
 def determine_next_after_github(
@@ -118,9 +157,7 @@ def determine_next_after_github(
     Returns:
         str: 次に実行するエージェントのタイプ
     """
-    query_type = state.get("query_type")
-
-    if query_type == QueryType.TASK_CREATION.value:
+    if state.get("query_type") == _TASK_CREATION:
         return "notion_task"
     else:
         return "slack_response"
@@ -152,6 +189,89 @@ def determine_next_after_notion(state: GraphState) -> Literal["slack_response"]:
     return "slack_response"
 
 
+def _make_agent_node(agent_type: str):
+    """
+    実行時の設定に含まれるエージェント関数へ処理を委譲するノードを作成
+
+    Args:
+        agent_type: エージェントの種類
+
+    Returns:
+        Callable: グラフのノードとして登録する関数
+    """
+
+    async def agent_node(state: GraphState, config: RunnableConfig) -> Dict:
+        agents = config["configurable"]["agents"]
+        return await agents[agent_type](state)
+
+    return agent_node
+
+
+@lru_cache(maxsize=1)
+def _get_compiled_graph():
+    """
+    エージェントグラフを構築してコンパイル（プロセス内で一度だけ）
+
+    ノードは実行時の設定（configurable["agents"]）で渡されたエージェント関数を
+    呼び出すため、複数のGraphManagerで同じコンパイル済みグラフを共有できます
+
+    Returns:
+        CompiledStateGraph: コンパイル済みのエージェントグラフ
+    """
+    # グラフを構築するための基本フレームワーク
+    builder = StateGraph(GraphState)
+
+    # ノードの追加（実行時にインスタンスのエージェントへ委譲）
+    for agent_type in AgentType:
+        builder.add_node(agent_type.value, _make_agent_node(agent_type.value))
+
+    # エントリーポイントの設定
+    builder.set_entry_point(AgentType.CONTROLLER.value)
+
+    # エッジの定義
+    # 1. コントローラーからの分岐
+    builder.add_conditional_edges(
+        AgentType.CONTROLLER.value,
+        determine_query_type,
+        {
+            AgentType.DB_QUERY.value: AgentType.DB_QUERY.value,
+            AgentType.GITHUB_RESEARCH.value: AgentType.GITHUB_RESEARCH.value,
+            AgentType.NOTION_TASK.value: AgentType.NOTION_TASK.value,
+            AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value,
+        },
+    )
+
+    # 2. GitHubリサーチ後の分岐
+    builder.add_conditional_edges(
+        AgentType.GITHUB_RESEARCH.value,
+        determine_next_after_github,
+        {
+            AgentType.NOTION_TASK.value: AgentType.NOTION_TASK.value,
+            AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value,
+        },
+    )
+
+    # 3. DBクエリ後の分岐
+    builder.add_conditional_edges(
+        AgentType.DB_QUERY.value,
+        determine_next_after_db,
+        {AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value},
+    )
+
+    # 4. Notionタスク作成後の分岐
+    builder.add_conditional_edges(
+        AgentType.NOTION_TASK.value,
+        determine_next_after_notion,
+        {AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value},
+    )
+
+    # 5. Slack応答は終了
+    builder.add_edge(AgentType.SLACK_RESPONSE.value, END)
+
+    # グラフをコンパイル
+    return builder.compile()
+
+
 class GraphManager:
     """
     LangGraphを使用したAIエージェントグラフを管理するクラス
@@ -181,11 +301,8 @@ class GraphManager:
         self.db_connection = db_connection
 
         # LLMの初期化
-        self.llm = ChatAnthropic(
-            model=ANTHROPIC_MODEL_NAME,
-            temperature=MODEL_TEMPERATURE,
-            anthropic_api_key=ANTHROPIC_API_KEY,  # 環境変数から自動読み込み
-        )
+        # （モデルハンドラーと同じインスタンスを共有し、HTTP接続を再利用する）
+        self.llm = get_llm("anthropic", ANTHROPIC_MODEL_NAME)
 
         # エージェントの初期化
         self.agents = {}
@@ -199,16 +316,15 @@ class GraphManager:
 
     def _create_controller_agent(self):
         """コントローラーエージェントを作成"""
-        prompts = get_agent_prompts()
+        # コントローラープロンプトはクエリごとに変わらないため一度だけ作成
+        system_message = SystemMessage(content=get_agent_prompts()["controller"])
 
         async def controller_agent(state: GraphState) -> Dict:
             """ユーザークエリを分析し、適切なエージェントに割り当てるコントローラーエージェント"""
             query = state["query"]
 
-            # コントローラープロンプトを作成
-            controller_prompt = prompts["controller"]
             messages = [
-                SystemMessage(content=controller_prompt),
+                system_message,
                 HumanMessage(
                     content=f"ユーザークエリ: {query}\n\nこのクエリの種類を判断し、適切なカテゴリに分類してください。"
                 ),
@@ -219,28 +335,9 @@ class GraphManager:
             response_text = response.content
 
             # レスポンスからクエリタイプを抽出（シンプルな実装）
-            query_type = QueryType.GENERAL.value  # デフォルト
-
-            if (
-                "データベース" in response_text.lower()
-                or "sql" in response_text.lower()
-                or "クエリ" in response_text.lower()
-            ):
-                query_type = QueryType.DB_QUERY.value
-            elif (
-                "github" in response_text.lower()
-                or "コード" in response_text.lower()
-                or "バグ" in response_text.lower()
-            ):
-                if (
-                    "タスク" in response_text.lower()
-                    or "notion" in response_text.lower()
-                ):
-                    query_type = QueryType.TASK_CREATION.value
-                else:
-                    query_type = QueryType.CODE_ISSUE.value
-
-            logger.info(f"クエリタイプ判定: {query_type}")
+            query_type = classify_query_type(response_text)
+
+            logger.info("クエリタイプ判定: %s", query_type)
 
             # 状態を更新
             return {"query_type": query_type}
@@ -290,58 +387,8 @@ class GraphManager:
         if not self.agents:
             await self.initialize_agents()
 
-        # グラフを構築するための基本フレームワーク
-        builder = StateGraph(GraphState)
-
-        # ノードの追加
-        for agent_type, agent_func in self.agents.items():
-            builder.add_node(agent_type, agent_func)
-
-        # エントリーポイントの設定
-        builder.set_entry_point(AgentType.CONTROLLER.value)
-
-        # エッジの定義
-        # 1. コントローラーからの分岐
-        builder.add_conditional_edges(
-            AgentType.CONTROLLER.value,
-            determine_query_type,
-            {
-                AgentType.DB_QUERY.value: AgentType.DB_QUERY.value,
-                AgentType.GITHUB_RESEARCH.value: AgentType.GITHUB_RESEARCH.value,
-                AgentType.NOTION_TASK.value: AgentType.NOTION_TASK.value,
-                AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value,
-            },
-        )
-
-        # 2. GitHubリサーチ後の分岐
-        builder.add_conditional_edges(
-            AgentType.GITHUB_RESEARCH.value,
-            determine_next_after_github,
-            {
-                AgentType.NOTION_TASK.value: AgentType.NOTION_TASK.value,
-                AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value,
-            },
-        )
-
-        # 3. DBクエリ後の分岐
-        builder.add_conditional_edges(
-            AgentType.DB_QUERY.value,
-            determine_next_after_db,
-            {AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value},
-        )
-
-        # 4. Notionタスク作成後の分岐
-        builder.add_conditional_edges(
-            AgentType.NOTION_TASK.value,
-            determine_next_after_notion,
-            {AgentType.SLACK_RESPONSE.value: AgentType.SLACK_RESPONSE.value},
-        )
-
-        # 5. Slack応答は終了
-        builder.add_edge(AgentType.SLACK_RESPONSE.value, END)
-
-        # グラフをコンパイル
-        self.graph = builder.compile()
+        # グラフの構造はインスタンスによらないため、コンパイル済みのものを共有
+        self.graph = _get_compiled_graph()
         return self.graph
 
     async def process_query(
@@ -377,12 +424,14 @@ class GraphManager:
 
         # グラフを実行
         try:
-            logger.info(f"クエリ処理開始: {query}")
-            result = await self.graph.ainvoke(initial_state)
+            logger.info("クエリ処理開始: %s", query)
+            result = await self.graph.ainvoke(
+                initial_state, config={"configurable": {"agents": self.agents}}
+            )
             logger.info("グラフ実行完了")
             return result
         except Exception as e:
-            logger.error(f"グラフ実行エラー: {e}")
+            logger.error("グラフ実行エラー: %s", e)
             return {
                 "query": query,
                 "error": str(e),
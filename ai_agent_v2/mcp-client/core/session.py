@@ -5,12 +5,21 @@ MCPサーバーとの接続と設定を管理します
 LangChain対応の機能を追加
 """
 
+import asyncio
+import logging
+from functools import partial
+
 from config import extract_default_channel_id, get_server_config, load_server_schema
 from langchain_core.tools import BaseTool
 from mcp import StdioServerParameters
 
 from .base import BaseMCPClient
 
+logger = logging.getLogger(__name__)
+
+# サーバー名→(作成元のスキーマ, (サーバーパラメータ, デフォルトチャンネルID))
+_server_params_cache = {}
+
 
 class ServerConnector:
     """
@@ -29,6 +38,13 @@ class ServerConnector:
             tuple: (StdioServerParameters, default_channel_id)
         """
         schema = load_server_schema(server_name)
+
+        # スキーマファイルが変更されていなければ（同じスキーマオブジェクトなら）
+        # 前回作成したパラメータを再利用
+        cached = _server_params_cache.get(server_name)
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+
         server_config = get_server_config(schema, server_name)
 
         command = server_config.get("command")
@@ -38,11 +54,14 @@ class ServerConnector:
         # Extract default channel ID if available in the environment variables
         default_channel_id = extract_default_channel_id(env)
         if default_channel_id:
-            print(f"Default channel ID set to: {default_channel_id}")
+            logger.debug("Default channel ID set to: %s", default_channel_id)
 
-        return StdioServerParameters(
-            command=command, args=args, env=env
-        ), default_channel_id
+        result = (
+            StdioServerParameters(command=command, args=args, env=env),
+            default_channel_id,
+        )
+        _server_params_cache[server_name] = (schema, result)
+        return result
 
     @staticmethod
     def create_server_params_from_script(server_script_path):
@@ -74,21 +93,28 @@ class MCPToolWrapper(BaseTool):
     name: str
     description: str
 
-    def __init__(self, name, description, session, tool_args_processor):
+    @classmethod
+    def create(cls, name, description, session, tool_args_processor):
         """
-        MCPToolWrapperの初期化
+        MCPToolWrapperを作成
+
+        サーバーを切り替えるたびに全ツール分作り直されるため、
+        model_constructでPydanticの検証を省いて作成します
 
         Args:
             name: ツール名
             description: ツールの説明
             session: MCPサーバーセッション
-            tool_args_processor: 引数処理関数
+            tool_args_processor: 引数を受け取り引数辞書を返す処理関数
+
+        Returns:
+            MCPToolWrapper: 作成したツール
         """
-        # スーパークラスの初期化
-        super().__init__(name=name, description=description)
+        wrapper = cls.model_construct(name=name, description=description)
         # フィールドを直接設定 - Pydanticの検証をバイパス
-        self._session = session
-        self._tool_processor = tool_args_processor
+        wrapper._session = session
+        wrapper._tool_processor = tool_args_processor
+        return wrapper
 
     def _run(self, **kwargs) -> str:
         """
@@ -114,10 +140,10 @@ class MCPToolWrapper(BaseTool):
         Returns:
             str: ツール実行結果
         """
-        from core.utils import extract_tool_content
+        from core.utils import extract_tool_content, format_error
 
         # 引数の処理
-        tool_args_dict = self._tool_processor(self.name, kwargs)
+        tool_args_dict = self._tool_processor(kwargs)
 
         try:
             # ツールの実行
@@ -126,9 +152,8 @@ class MCPToolWrapper(BaseTool):
             # 結果の抽出と処理
             return extract_tool_content(tool_result.content)
         except Exception as e:
-            error_msg = f"Error calling tool {self.name}: {str(e)}"
-            print(error_msg)
-            return f"Error: {str(e)}"
+            logger.error("Error calling tool %s: %s", self.name, e)
+            return format_error("Error", e)
 
 
 class SessionManager(BaseMCPClient):
@@ -154,17 +179,48 @@ class SessionManager(BaseMCPClient):
         Returns:
             list: 利用可能なツールのリスト
         """
-        server_params, default_channel_id = (
-            ServerConnector.create_server_params_from_name(server_name)
-        )
-        self.default_channel_id = default_channel_id
-        tools = await self.connect_to_server(server_params, server_name)
+        if server_name in self.sessions:
+            # 接続済みのサーバーであれば再接続せずに切り替える
+            tools = self.use_server(server_name)
+        else:
+            server_params, default_channel_id = (
+                ServerConnector.create_server_params_from_name(server_name)
+            )
+            tools = await self.connect_to_server(
+                server_params, server_name, default_channel_id
+            )
 
         # LangChain用のツールラッパーを準備
         await self.prepare_langchain_tools(tools)
 
         return tools
 
+    async def connect_to_servers(self, server_names):
+        """
+        複数のMCPサーバーに並行して接続（現在のサーバーは切り替えない）
+
+        起動時にまとめて接続しておくことで、サーバー間の操作で
+        プロセスの起動を待たずに済むようにします。接続に失敗した
+        サーバーは警告を出力してスキップします。
+
+        Args:
+            server_names: 接続するサーバー名のリスト
+        """
+
+        async def open_by_name(server_name):
+            server_params, default_channel_id = (
+                ServerConnector.create_server_params_from_name(server_name)
+            )
+            await self.open_server(server_params, server_name, default_channel_id)
+
+        names = [name for name in server_names if name not in self.sessions]
+        results = await asyncio.gather(
+            *(open_by_name(name) for name in names), return_exceptions=True
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning("サーバー %s に接続できませんでした: %s", name, result)
+
     async def connect_to_server_by_script(self, server_script_path):
         """
         スクリプトパスを使用してMCPサーバーに接続
@@ -189,24 +245,23 @@ class SessionManager(BaseMCPClient):
         """
         MCPツールをLangChain用のツールラッパーに変換
         """
-        from core.utils import process_tool_arguments
+        from core.utils import make_tool_arg_processor
 
         self.langchain_tools = []
 
-        for tool in mcp_tools:
-            # 引数処理関数
-            def create_tool_processor(tool_name):
-                def processor(_, args):
-                    return process_tool_arguments(
-                        tool_name, args, self.default_channel_id
-                    )
-
-                return processor
+        # ツールラッパーは現在のサーバーのセッションとチャンネルIDに固定する
+        # （サーバーを切り替えるとこのメソッドで作り直される）
+        default_channel_id = self.default_channel_id
 
-            tool_processor = create_tool_processor(tool.name)
+        for tool in mcp_tools:
+            # 引数処理関数（ツール名による分岐は作成時に一度だけ評価）
+            tool_processor = partial(
+                make_tool_arg_processor(tool.name),
+                default_channel_id=default_channel_id,
+            )
 
             # 新しいツールラッパーを作成
-            langchain_tool = MCPToolWrapper(
+            langchain_tool = MCPToolWrapper.create(
                 name=tool.name,
                 description=tool.description,
                 session=self.session,  # self ではなく self.session を渡す
@@ -4,7 +4,102 @@
 様々なヘルパー関数を提供します
 """
 
+import io
 import json
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import islice
+
+try:
+    # orjsonがインストールされていれば高速なJSONパーサーを使用
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # ijsonがインストールされていれば、巨大なJSONを要素ごとに逐次パースする
+    import ijson
+except ImportError:
+    ijson = None
+
+# デフォルトのチャンネルIDを補完するSlackツール
+_CHANNEL_ID_TOOLS = frozenset({"slack_post_message", "slack_reply_to_thread"})
+
+# analyze_code_issuesで検出するキーワード（グループ名が問題の種類）
+# 先読みで各位置を判定するため、重なり合うキーワードも取りこぼしません
+# TODO/FIXMEは大文字のみ、それ以外は大文字小文字を区別しません
+_CODE_ISSUE_RE = re.compile(
+    r"(?=(?P<todo>TODO)|(?P<fixme>FIXME)|(?i:(?P<bug>bug)"
+    r"|(?P<secret>password|secret|key|token|パスワード|秘密)"
+    r"|(?P<hardcoded>hardcoded|ハードコード)"
+    r"|(?P<try>try)|(?P<handler>except|catch)))"
+)
+
+# ネストされたループの簡易検出に使用する、行頭のforループ（グループ1がインデント）
+# 「format」「before」などの単語の一部や、内包表記のforには一致しません
+_FOR_LOOP_RE = re.compile(
+    r"^([ \t]*)(?:async[ \t]+)?for\b(?=[ \t]*\(|[^\n]*(?:\bin\b|[:{][ \t]*$))",
+    re.MULTILINE,
+)
+
+
+def json_loads(text):
+    """
+    JSON文字列をパース（orjsonが利用可能ならorjsonを使用）
+
+    orjson.JSONDecodeErrorはjson.JSONDecodeErrorのサブクラスのため、
+    呼び出し側は標準ライブラリと同じ例外で失敗を扱えます
+
+    Args:
+        text: JSON文字列
+
+    Returns:
+        Any: パースされた値
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def json_dumps(obj):
+    """
+    値をJSON文字列に変換（orjsonが利用可能ならorjsonを使用）
+
+    Args:
+        obj: 変換する値
+
+    Returns:
+        str: JSON文字列（非ASCII文字はエスケープしない）
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+class ToolDispatcher:
+    """
+    LangChainのToolから呼ばれ、ツール名を付けてツール実行関数に委譲する呼び出し可能オブジェクト
+
+    ツールごとにクロージャを作る代わりに使用します。ツール名は属性として保持するため、
+    引数にtool_nameが含まれていても上書きされません。
+    """
+
+    __slots__ = ("executor", "tool_name")
+
+    def __init__(self, executor, tool_name):
+        """
+        ToolDispatcherの初期化
+
+        Args:
+            executor: (ツール名, 引数辞書) を受け取るツール実行関数
+            tool_name: ツール名
+        """
+        self.executor = executor
+        self.tool_name = tool_name
+
+    async def __call__(self, **kwargs):
+        return await self.executor(self.tool_name, kwargs)
 
 
 def extract_tool_content(content):
@@ -17,18 +112,164 @@ def extract_tool_content(content):
     Returns:
         str: 抽出されたテキストコンテンツ
     """
-    if hasattr(content, "__iter__") and not isinstance(content, str):
-        # It's an iterable of TextContent objects
-        result_texts = []
-        for item in content:
-            if hasattr(item, "text"):
-                result_texts.append(item.text)
-        return "".join(result_texts)
+    if isinstance(content, str):
+        # Already text - return as is without copying
+        return content
+    if isinstance(content, (list, tuple)):
+        if len(content) == 1:
+            # 最も多い単一要素の応答はリストを作らずに直接取り出す
+            return getattr(content[0], "text", "")
+        # It's a list of TextContent objects
+        # （str.joinは内部でシーケンス化するため、ジェネレータよりリストの方が速い）
+        return "".join([item.text for item in content if hasattr(item, "text")])
     else:
         # It's a single value
         return str(content)
 
 
+def truncate_for_llm(text, limit):
+    """
+    LLMに渡すツール結果を上限文字数までに切り詰める
+
+    Args:
+        text: ツール結果のテキスト
+        limit: 最大文字数
+
+    Returns:
+        str: 切り詰めたテキスト（上限以内の場合はそのまま）
+    """
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}\n...（残り{len(text) - limit}文字を省略）"
+
+
+def iter_paragraphs(text, sep="\n\n"):
+    """
+    テキストを段落ごとに順に取り出す
+
+    str.splitと同じ区切り方ですが、全段落のリストを一度に作らないため、
+    巨大なツール出力から先頭の数段落だけを使う場合にメモリを抑えられます
+
+    Args:
+        text: 分割するテキスト
+        sep: 段落の区切り文字列
+
+    Yields:
+        str: 段落
+    """
+    start = 0
+    while True:
+        end = text.find(sep, start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + len(sep)
+
+
+@lru_cache(maxsize=8)
+def _format_due_date(today, days):
+    """
+    指定日から指定日数後の日付をYYYY-MM-DD形式に整形
+
+    Args:
+        today: 基準日
+        days: 基準日からの日数
+
+    Returns:
+        str: 整形された日付
+    """
+    return (today + timedelta(days=days)).isoformat()
+
+
+def due_date_from_today(days=7):
+    """
+    今日から指定日数後の期限日をYYYY-MM-DD形式で取得
+
+    日付の計算と整形は日付ごとに一度だけ行い、同じ日のうちは結果を再利用します
+    （キーが日付のため、日付が変わると自動的に計算し直されます）
+
+    Args:
+        days: 今日からの日数
+
+    Returns:
+        str: 期限日（例: "2025-01-08"）
+    """
+    return _format_due_date(date.today(), days)
+
+
+def format_error(prefix, error):
+    """
+    例外を呼び出し元に返すエラーメッセージに整形
+
+    ツール実行やサービス処理のエラー応答で書式を揃えるための共通関数です
+
+    Args:
+        prefix: メッセージの先頭に付ける説明（例: "GitHub情報取得エラー"）
+        error: 発生した例外
+
+    Returns:
+        str: 「説明: 例外の型名: 例外メッセージ」形式のメッセージ
+    """
+    return f"{prefix}: {type(error).__name__}: {error}"
+
+
+def parse_tool_json(text):
+    """
+    ツール応答のテキストがJSONであれば一度だけパースして返す
+
+    先頭文字で安価に判定し、JSONでない場合やパースに失敗した場合はNoneを返します
+
+    Args:
+        text: ツール応答のテキスト
+
+    Returns:
+        dict | list | None: パースされたJSON（JSONでない場合はNone）
+    """
+    if not isinstance(text, str):
+        return None
+
+    stripped = text.lstrip()
+    if stripped[:1] not in ("{", "["):
+        return None
+
+    try:
+        return json_loads(stripped)
+    except json.JSONDecodeError:
+        return None
+
+
+def iter_json_array(text, key):
+    """
+    ツール応答のJSONオブジェクトから、指定キーの配列の要素を順に取り出す
+
+    ijsonが利用可能な場合は要素ごとに逐次パースするため、
+    目的の要素が見つかった時点で走査を打ち切れば残りのJSONはパースされません。
+    利用できない場合はparse_tool_jsonで全体をパースしてから要素を返します。
+    JSONでない場合や壊れたJSONの場合は、それまでに読めた要素だけを返します
+
+    Args:
+        text: ツール応答のテキスト
+        key: 配列を持つトップレベルのキー（例: "results"）
+
+    Yields:
+        Any: 配列の要素
+    """
+    if not isinstance(text, str) or text.lstrip()[:1] != "{":
+        return
+
+    if ijson is None:
+        parsed = parse_tool_json(text)
+        if isinstance(parsed, dict):
+            yield from parsed.get(key, [])
+        return
+
+    try:
+        yield from ijson.items(io.BytesIO(text.encode()), f"{key}.item")
+    except ijson.JSONError:
+        return
+
+
 def analyze_code_issues(code_content, search_term):
     """
     コードの問題点を分析
@@ -42,45 +283,51 @@ def analyze_code_issues(code_content, search_term):
     """
     issues = []
 
+    # 全キーワードを1回の走査で検出
+    found = {
+        name
+        for match in _CODE_ISSUE_RE.finditer(code_content)
+        for name, value in match.groupdict().items()
+        if value is not None
+    }
+
     # 明らかなコードの問題を検出
-    if "TODO" in code_content:
+    if "todo" in found:
         issues.append("未完了の TODO コメントが含まれています")
 
-    if "FIXME" in code_content:
+    if "fixme" in found:
         issues.append("修正が必要な FIXME コメントが含まれています")
 
-    if "BUG" in code_content or "bug" in code_content.lower():
+    if "bug" in found:
         issues.append("バグに関する言及があります")
 
     # セキュリティ関連の問題
-    if any(
-        term in code_content.lower()
-        for term in ["password", "secret", "key", "token", "パスワード", "秘密"]
-    ):
-        if any(term in code_content.lower() for term in ["hardcoded", "ハードコード"]):
-            issues.append("ハードコードされた機密情報が含まれている可能性があります")
+    if "secret" in found and "hardcoded" in found:
+        issues.append("ハードコードされた機密情報が含まれている可能性があります")
 
     # エラーハンドリング
-    if (
-        "try" in code_content.lower()
-        and "except" not in code_content.lower()
-        and "catch" not in code_content.lower()
-    ):
+    if "try" in found and "handler" not in found:
         issues.append("エラーハンドリングが不完全な可能性があります")
 
     # 検索語に基づく分析
-    if search_term.lower() in code_content.lower():
-        lines_with_term = [
-            line.strip()
-            for line in code_content.split("\n")
-            if search_term.lower() in line.lower()
-        ]
-        if lines_with_term:
-            term_context = "\n".join(lines_with_term[:3])  # 最初の3行まで
+    # 大文字小文字を区別しない正規表現で照合し、コード全体を小文字化したコピーを作らない
+    term_re = re.compile(re.escape(search_term), re.IGNORECASE)
+    # （行のリストは作らず、最初の3行が見つかった時点で走査を打ち切る）
+    if term_re.search(code_content):
+        lines_with_term = islice(
+            (
+                line.strip()
+                for line in iter_paragraphs(code_content, "\n")
+                if term_re.search(line)
+            ),
+            3,
+        )
+        term_context = "\n".join(lines_with_term)  # 最初の3行まで
+        if term_context:
             issues.append(f"検索語「{search_term}」を含む箇所:\n{term_context}")
 
-    # パフォーマンスの問題
-    if "for" in code_content.lower() and "for" in code_content.lower().split("for")[1]:
+    # パフォーマンスの問題（ネストされたループが見つかった時点で走査を打ち切る）
+    if _has_nested_loop(code_content):
         issues.append(
             "ネストされたループがあり、パフォーマンスの問題がある可能性があります"
         )
@@ -92,46 +339,154 @@ def analyze_code_issues(code_content, search_term):
         return "明らかな問題は検出されませんでした"
 
 
-def process_tool_arguments(tool_name, tool_args, default_channel_id=None):
+def _has_nested_loop(code_content):
     """
-    ツール引数を処理し、実行のために準備
+    外側のforループの本体の中に、さらにforループがあるかを判定
+
+    インデントのみで判定する簡易的な検出のため、ループ本体は
+    ループより深くインデントされた行が続く範囲とみなします
 
     Args:
-        tool_name: 呼び出すツールの名前
-        tool_args: ツールに渡す引数（文字列または辞書）
-        default_channel_id: デフォルトのSlackチャンネルID
+        code_content: コード内容
 
     Returns:
-        dict: 処理された引数辞書
+        bool: ネストされたループがあると思われる場合はTrue
+    """
+    loop_indents = []  # 本体の中にいるforループのインデント幅
+    for line in iter_paragraphs(code_content, "\n"):
+        body = line.lstrip(" \t")
+        if not body.strip():
+            continue
+        indent = len(line[: len(line) - len(body)].expandtabs())
+        # 同じかより浅いインデントの行が現れたら、そのループの本体は終わっている
+        while loop_indents and loop_indents[-1] >= indent:
+            loop_indents.pop()
+        if _FOR_LOOP_RE.match(line):
+            if loop_indents:
+                return True
+            loop_indents.append(indent)
+    return False
+
+
+def _parse_str_args(tool_args):
+    """
+    文字列のツール引数を辞書に変換
+
+    Args:
+        tool_args: 文字列のツール引数
+
+    Returns:
+        dict: 変換された引数辞書
     """
-    if isinstance(tool_args, str) and tool_args.strip() == "{}":
-        # Empty JSON object as string - convert to empty dict
-        tool_args_dict = {}
-    elif isinstance(tool_args, str) and tool_args.strip().startswith("{"):
+    if tool_args == "{}" or not tool_args:
+        # Fast path for no-argument calls - skip strip() entirely
+        return {}
+
+    # 先頭の文字だけでJSONかどうかを判定（先頭に空白がある場合のみlstripする）
+    first = tool_args[0]
+    if first.isspace():
+        first = tool_args.lstrip()[:1]
+
+    if first == "{":
         # Try to parse as JSON string
         try:
-            tool_args_dict = json.loads(tool_args)
+            return json_loads(tool_args)
         except json.JSONDecodeError:
-            tool_args_dict = {"text": tool_args}
-    else:
-        # Already a dict or other input
-        tool_args_dict = (
-            tool_args if isinstance(tool_args, dict) else {"text": tool_args}
-        )
+            pass
+    return {"text": tool_args}
+
+
+def _wrap_other_args(tool_args):
+    """
+    文字列以外のツール引数を辞書に変換
+
+    Args:
+        tool_args: ツール引数
 
-    # Add default channel_id if available and needed for Slack tools
-    if default_channel_id and "channel_id" not in tool_args_dict:
-        if tool_name.startswith("slack_") and (
-            "channel" in tool_name
-            or tool_name == "slack_post_message"
-            or tool_name == "slack_reply_to_thread"
+    Returns:
+        dict: 辞書ならそのまま、それ以外はtextとして包んだ辞書
+    """
+    return tool_args if isinstance(tool_args, dict) else {"text": tool_args}
+
+
+# 引数の型ごとの変換処理（辞書が最も多いため1回のルックアップで済む）
+_ARG_PARSERS = {
+    dict: lambda tool_args: tool_args,
+    str: _parse_str_args,
+    type(None): lambda _: {},
+}
+
+
+def _parse_tool_args(tool_args):
+    """
+    ツール引数を型に応じて辞書に変換
+
+    Args:
+        tool_args: ツールに渡す引数（文字列または辞書）
+
+    Returns:
+        dict: 変換された引数辞書
+    """
+    return _ARG_PARSERS.get(type(tool_args), _wrap_other_args)(tool_args)
+
+
+@lru_cache(maxsize=None)
+def make_tool_arg_processor(tool_name):
+    """
+    ツールごとに特化した引数処理関数を作成
+
+    ツール名による分岐（チャンネルIDの補完やテキストの補完が必要か）を
+    作成時に一度だけ評価し、呼び出しごとの判定を省きます。
+    作成した関数はツール名をキーにプロセス全体で共有されるため、
+    2回目以降の呼び出しは辞書の参照1回で済みます
+
+    Args:
+        tool_name: ツールの名前
+
+    Returns:
+        Callable: (tool_args, default_channel_id) を受け取り引数辞書を返す関数
+    """
+    # チャンネルを扱うSlackツール（例: slack_get_channel_history）も対象
+    needs_channel = tool_name in _CHANNEL_ID_TOOLS or (
+        tool_name.startswith("slack_") and "channel" in tool_name[6:]
+    )
+    needs_text = tool_name == "slack_post_message"
+
+    if not needs_channel and not needs_text:
+        return lambda tool_args, default_channel_id=None: _parse_tool_args(tool_args)
+
+    def processor(tool_args, default_channel_id=None):
+        tool_args_dict = _parse_tool_args(tool_args)
+
+        # Add default channel_id if available and needed for Slack tools
+        if (
+            needs_channel
+            and default_channel_id
+            and "channel_id" not in tool_args_dict
         ):
             tool_args_dict["channel_id"] = default_channel_id
 
-    # For slack_post_message, make sure we have text
-    if tool_name == "slack_post_message" and "text" not in tool_args_dict:
-        # Try to extract text from context
-        if isinstance(tool_args, str) and not tool_args.startswith("{"):
-            tool_args_dict["text"] = tool_args.strip()
+        # For slack_post_message, make sure we have text
+        if needs_text and "text" not in tool_args_dict:
+            # Try to extract text from context
+            if isinstance(tool_args, str) and not tool_args.startswith("{"):
+                tool_args_dict["text"] = tool_args.strip()
+
+        return tool_args_dict
+
+    return processor
+
+
+def process_tool_arguments(tool_name, tool_args, default_channel_id=None):
+    """
+    ツール引数を処理し、実行のために準備
+
+    Args:
+        tool_name: 呼び出すツールの名前
+        tool_args: ツールに渡す引数（文字列または辞書）
+        default_channel_id: デフォルトのSlackチャンネルID
 
-    return tool_args_dict
+    Returns:
+        dict: 処理された引数辞書
+    """
+    return make_tool_arg_processor(tool_name)(tool_args, default_channel_id)
@@ -6,11 +6,10 @@ LangChainのAgentを使用して、必要に応じてSQLを生成・実行しま
 """
 
 import logging
-from typing import Dict
+from typing import Any, AsyncIterator, Dict
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
 
 from database.connection import DatabaseConnection
 from database.query import NaturalLanguageQueryProcessor
@@ -44,8 +43,8 @@ class DatabaseQueryAgent:
         if not self._initialized:
             # データベース接続を確立
             if (
-                not hasattr(self.db_connection, "_connection")
-                or self.db_connection._connection is None
+                not hasattr(self.db_connection, "_engine")
+                or self.db_connection._engine is None
             ):
                 await self.db_connection.connect()
 
@@ -75,7 +74,7 @@ class DatabaseQueryAgent:
 
             if is_db_query:
                 # データベースクエリとして処理
-                logger.info(f"データベースクエリと判断されました: {query}")
+                logger.info("データベースクエリと判断されました: %s", query)
                 result = await self.nl_processor.process_query(query)
 
                 # 処理情報を追加
@@ -85,7 +84,7 @@ class DatabaseQueryAgent:
                 return result
             else:
                 # データベースクエリではないと判断
-                logger.info(f"非データベースクエリと判断されました: {query}")
+                logger.info("非データベースクエリと判断されました: %s", query)
                 return {
                     "query_type": "non_database",
                     "original_query": query,
@@ -93,7 +92,7 @@ class DatabaseQueryAgent:
                 }
 
         except Exception as e:
-            logger.error(f"クエリ処理エラー: {str(e)}")
+            logger.error("クエリ処理エラー: %s", e)
             return {
                 "query_type": "error",
                 "original_query": query,
@@ -101,6 +100,24 @@ class DatabaseQueryAgent:
                 "explanation": f"クエリの処理中にエラーが発生しました: {str(e)}",
             }
 
+    async def stream_query(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        データベースクエリと判断済みのクエリを処理し、結果と説明をストリーミングで返す
+
+        SQLの生成・実行が終わった時点で結果を返し、説明文は生成されたそばから返します
+
+        Args:
+            query: 自然言語のクエリ
+
+        Yields:
+            Dict[str, Any]: NaturalLanguageQueryProcessor.stream_queryのイベント
+        """
+        if not self._initialized:
+            await self.initialize()
+
+        async for event in self.nl_processor.stream_query(query):
+            yield event
+
     async def is_database_query(self, query: str) -> bool:
         """
         クエリがデータベース関連かどうかを判断
@@ -112,13 +129,12 @@ class DatabaseQueryAgent:
             bool: データベース関連のクエリならTrue、そうでなければFalse
         """
         # スキーマ情報を取得
-        schema_info = self.db_connection.get_schema_info()
+        schema_info = self.db_connection.schema_info
 
-        # 判断用のプロンプト
-        decider_prompt = ChatPromptTemplate.from_messages(
-            [
-                SystemMessage(
-                    content=f"""あなたはユーザークエリを分析し、それがデータベース検索かどうかを判断する専門家です。
+        # 判断用のメッセージ（テンプレートを介さず直接組み立てる）
+        messages = [
+            SystemMessage(
+                content=f"""あなたはユーザークエリを分析し、それがデータベース検索かどうかを判断する専門家です。
 以下のデータベース情報があります:
 
 {schema_info}
@@ -129,14 +145,13 @@ class DatabaseQueryAgent:
 
 回答は「データベースクエリ」または「非データベースクエリ」のみにしてください。
 """
-                ),
-                HumanMessage(content=f"ユーザーの質問: {query}"),
-            ]
-        )
+            ),
+            HumanMessage(content=f"ユーザーの質問: {query}"),
+        ]
 
         # LLMに判断させる
-        chain = decider_prompt | self.llm | StrOutputParser()
-        result = await chain.ainvoke({})
+        chain = self.llm | StrOutputParser()
+        result = await chain.ainvoke(messages)
 
         return "データベースクエリ" in result
 
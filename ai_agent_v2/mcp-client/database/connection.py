@@ -5,16 +5,77 @@ SQLAlchemyを使用してデータベースへの接続を管理します。
 様々なデータベース（MySQL、PostgreSQL、SQLite）に対応しています。
 """
 
+import asyncio
+import hashlib
+import io
+import json
 import logging
-from typing import Dict, List
-
-from config import DB_SCHEMA_DESCRIPTION, get_db_url
+import os
+import time
+from functools import cached_property
+from typing import Any, Dict, List, Mapping, Optional
+
+from config import (
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_SCHEMA_CACHE_DIR,
+    DB_SCHEMA_CACHE_TTL,
+    DB_SCHEMA_DESCRIPTION,
+    DB_URL,
+)
 from langchain_community.utilities import SQLDatabase
-from sqlalchemy import MetaData, create_engine, inspect, text
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import Engine, Inspector
+from sqlalchemy.pool import StaticPool
 
 logger = logging.getLogger(__name__)
 
 
+def _create_pooled_engine(db_url: str) -> Engine:
+    """
+    コネクションプールを設定したエンジンを作成
+
+    Args:
+        db_url: データベース接続URL
+
+    Returns:
+        Engine: SQLAlchemyのエンジン
+    """
+    if db_url in ("sqlite://", "sqlite:///:memory:"):
+        # インメモリDBは接続ごとに別のDBになるため、単一の接続を共有する
+        return create_engine(
+            db_url,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+
+    return create_engine(
+        db_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_POOL_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        # 切断された接続（MySQLのwait_timeoutなど）を使用前に検出して張り直す
+        pool_pre_ping=True,
+    )
+
+
+def _schema_cache_path(db_url: str) -> str:
+    """
+    接続先ごとのスキーマキャッシュファイルのパスを取得
+
+    Args:
+        db_url: データベース接続URL（パスワードを含むためハッシュ化して使用）
+
+    Returns:
+        str: キャッシュファイルのパス
+    """
+    digest = hashlib.sha256(db_url.encode()).hexdigest()[:16]
+    return os.path.join(DB_SCHEMA_CACHE_DIR, f"schema_{digest}.json")
+
+
 class DatabaseConnection:
     """
     データベース接続を管理するクラス
@@ -26,8 +87,6 @@ class DatabaseConnection:
     def __init__(self):
         """DatabaseConnectionの初期化"""
         self._engine = None
-        self._connection = None
-        self._metadata = None
         self._inspector = None
         self._langchain_db = None
         self._tables_info = None
@@ -40,28 +99,38 @@ class DatabaseConnection:
             bool: 接続成功時はTrue、失敗時はFalse
         """
         try:
-            db_url = get_db_url()
-            print(f"データベースURL: {db_url}")
-            self._engine = create_engine(db_url)
-            self._connection = self._engine.connect()
-            self._metadata = MetaData()
-            self._metadata.reflect(bind=self._engine)
-            self._inspector = inspect(self._engine)
-
-            # LangChain SQLDatabaseインスタンスを作成
-            self._langchain_db = SQLDatabase.from_uri(db_url)
-
-            logger.info(f"データベースに接続しました: {db_url}")
+            self._engine = _create_pooled_engine(DB_URL)
+
+            # 接続できることを確認（確立した接続はプールに戻して再利用）
+            # Inspectorとテーブル一覧を取得するSQLDatabaseは、必要になった時点で作成する
+            with self._engine.connect():
+                pass
+            self._inspector = None
+            self._langchain_db = None
+
+            # 前回取得したスキーマ情報が有効期間内であれば再利用
+            self._tables_info = self._load_cached_schema_info()
+            # 再接続時は前回の接続で作成したスキーマ説明を破棄
+            self.__dict__.pop("schema_info", None)
+
+            # パスワードを伏せた接続先をログに出力
+            logger.info(
+                "データベースに接続しました: %s",
+                self._engine.url.render_as_string(hide_password=True),
+            )
             return True
         except Exception as e:
-            logger.error(f"データベース接続エラー: {str(e)}")
+            logger.error("データベース接続エラー: %s", e)
             return False
 
     async def disconnect(self) -> None:
         """データベース接続を閉じる"""
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        if self._engine:
+            # プール内の接続をすべて閉じる
+            self._engine.dispose()
+            self._engine = None
+            self._inspector = None
+            self._langchain_db = None
             logger.info("データベース接続を閉じました")
 
     def get_langchain_db(self) -> SQLDatabase:
@@ -71,12 +140,33 @@ class DatabaseConnection:
         Returns:
             SQLDatabase: LangChainのSQLDatabaseインスタンス
         """
-        if not self._langchain_db:
-            raise ValueError(
-                "データベースに接続されていません。先にconnect()を呼び出してください。"
+        if self._langchain_db is None:
+            if not self._engine:
+                raise ValueError(
+                    "データベースに接続されていません。先にconnect()を呼び出してください。"
+                )
+            # 作成時にテーブル一覧を取得するため、初回の呼び出しまで遅延させる
+            # （同じエンジンを共有し、テーブル定義は必要になった時点で取得する）
+            self._langchain_db = SQLDatabase(
+                self._engine, lazy_table_reflection=True
             )
         return self._langchain_db
 
+    def _get_inspector(self) -> Inspector:
+        """
+        スキーマ取得用のInspectorを取得（初回の呼び出し時に作成）
+
+        Returns:
+            Inspector: SQLAlchemyのInspector
+        """
+        if self._inspector is None:
+            if not self._engine:
+                raise ValueError(
+                    "データベースに接続されていません。先にconnect()を呼び出してください。"
+                )
+            self._inspector = inspect(self._engine)
+        return self._inspector
+
     def get_table_names(self) -> List[str]:
         """
         テーブル名のリストを取得
@@ -84,11 +174,7 @@ class DatabaseConnection:
         Returns:
             List[str]: データベース内のテーブル名のリスト
         """
-        if not self._inspector:
-            raise ValueError(
-                "データベースに接続されていません。先にconnect()を呼び出してください。"
-            )
-        return self._inspector.get_table_names()
+        return self._get_inspector().get_table_names()
 
     def get_table_info(self, table_name: str) -> Dict:
         """
@@ -100,14 +186,10 @@ class DatabaseConnection:
         Returns:
             Dict: テーブル情報（カラム、制約など）
         """
-        if not self._inspector:
-            raise ValueError(
-                "データベースに接続されていません。先にconnect()を呼び出してください。"
-            )
-
-        columns = self._inspector.get_columns(table_name)
-        pk = self._inspector.get_pk_constraint(table_name)
-        fks = self._inspector.get_foreign_keys(table_name)
+        inspector = self._get_inspector()
+        columns = inspector.get_columns(table_name)
+        pk = inspector.get_pk_constraint(table_name)
+        fks = inspector.get_foreign_keys(table_name)
 
         return {
             "name": table_name,
@@ -116,77 +198,149 @@ class DatabaseConnection:
             "foreign_keys": fks,
         }
 
-    def get_schema_info(self) -> str:
+    @cached_property
+    def schema_info(self) -> str:
         """
-        データベーススキーマの説明を取得（LLM用）
+        データベーススキーマの説明（LLM用）
+
+        接続中は一度だけ作成し、以降は同じ文字列を返します
 
         Returns:
             str: データベーススキーマの説明
         """
         if self._tables_info is None:
             self._tables_info = self._generate_schema_info()
+            self._save_schema_info(self._tables_info)
 
         return DB_SCHEMA_DESCRIPTION + "\n" + self._tables_info
 
-    def _generate_schema_info(self) -> str:
+    def refresh_schema(self) -> None:
         """
-        テーブル情報に基づいてスキーマ情報を生成
+        キャッシュしたスキーマ情報を破棄し、次回の取得時にデータベースから再取得させる
 
-        Returns:
-            str: 生成されたスキーマ情報
+        テーブル定義を変更した後に呼び出してください
         """
-        if not self._inspector:
-            raise ValueError(
-                "データベースに接続されていません。先にconnect()を呼び出してください。"
-            )
+        self._tables_info = None
+        self.__dict__.pop("schema_info", None)  # cached_propertyの値を破棄
+        # Inspectorは取得結果を内部にキャッシュするため、次回の取得時に作り直す
+        self._inspector = None
 
-        tables = self.get_table_names()
-        schema_info = []
+        try:
+            os.remove(_schema_cache_path(DB_URL))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("スキーマキャッシュの削除に失敗しました: %s", e)
 
-        for table in tables:
-            columns = self._inspector.get_columns(table)
-            column_details = []
+    def _load_cached_schema_info(self) -> Optional[str]:
+        """
+        ファイルにキャッシュしたスキーマ情報を読み込む
 
-            for col in columns:
-                col_type = str(col["type"])
-                constraints = []
+        Returns:
+            Optional[str]: 有効期間内のスキーマ情報（ない場合はNone）
+        """
+        if DB_SCHEMA_CACHE_TTL <= 0:
+            return None
 
-                if col.get("nullable") is False:
-                    constraints.append("NOT NULL")
-                if col.get("default") is not None:
-                    constraints.append(f"DEFAULT {col['default']}")
+        path = _schema_cache_path(DB_URL)
+        try:
+            if time.time() - os.path.getmtime(path) > DB_SCHEMA_CACHE_TTL:
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["tables_info"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # キャッシュがない・壊れている場合はデータベースから取得する
+            return None
+
+    def _save_schema_info(self, tables_info: str) -> None:
+        """
+        スキーマ情報をファイルにキャッシュ
 
-                constraint_str = " ".join(constraints) if constraints else ""
-                column_details.append(f"- {col['name']}: {col_type} {constraint_str}")
+        Args:
+            tables_info: 生成したスキーマ情報
+        """
+        if DB_SCHEMA_CACHE_TTL <= 0:
+            return
 
-            schema_info.append(f"テーブル: {table}")
-            schema_info.append("\nカラム:")
-            schema_info.append("\n".join(column_details))
-            schema_info.append("\n")
+        path = _schema_cache_path(DB_URL)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"tables_info": tables_info}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # キャッシュの保存に失敗しても処理は継続する
+            logger.warning("スキーマキャッシュの保存に失敗しました: %s", e)
 
-        return "\n".join(schema_info)
+    def _generate_schema_info(self) -> str:
+        """
+        テーブル情報に基づいてスキーマ情報を生成
 
-    async def execute_raw_query(self, query: str) -> List[Dict]:
+        Returns:
+            str: 生成されたスキーマ情報
         """
-        生のSQLクエリを実行し、結果を辞書のリストとして返す
+        # 全テーブルのカラム情報を1回の問い合わせでまとめて取得
+        multi_columns = self._get_inspector().get_multi_columns()
+        buf = io.StringIO()
+
+        for i, ((_, table), columns) in enumerate(
+            sorted(multi_columns.items(), key=lambda item: item[0][1])
+        ):
+            if i:
+                buf.write("\n")
+            buf.write(f"テーブル: {table}\n\nカラム:\n")
+
+            for j, col in enumerate(columns):
+                if j:
+                    buf.write("\n")
+                not_null = "NOT NULL" if col.get("nullable") is False else ""
+                default = col.get("default")
+                if default is None:
+                    constraint_str = not_null
+                elif not_null:
+                    constraint_str = f"{not_null} DEFAULT {default}"
+                else:
+                    constraint_str = f"DEFAULT {default}"
+                buf.write(f"- {col['name']}: {col['type']} {constraint_str}")
+
+            buf.write("\n\n")
+
+        return buf.getvalue()
+
+    async def execute_raw_query(self, query: str) -> List[Mapping[str, Any]]:
+        """
+        生のSQLクエリを実行し、結果を行ごとのマッピングのリストとして返す
 
         Args:
             query: 実行するSQLクエリ
 
         Returns:
-            List[Dict]: クエリ結果
+            List[Mapping[str, Any]]: クエリ結果（カラム名をキーとする読み取り専用の行）
         """
-        if not self._connection:
+        if not self._engine:
             raise ValueError(
                 "データベースに接続されていません。先にconnect()を呼び出してください。"
             )
 
         try:
-            result = self._connection.execute(text(query))
-            columns = result.keys()
-            rows = result.fetchall()
-
-            return [dict(zip(columns, row)) for row in rows]
+            # 接続の取得とクエリの実行はブロッキングするため、イベントループを
+            # 止めないよう別スレッドで行い、並行するクエリをプールの接続で同時に実行する
+            return await asyncio.to_thread(self._execute_query, query)
         except Exception as e:
-            logger.error(f"クエリ実行エラー: {str(e)}")
+            logger.error("クエリ実行エラー: %s", e)
             raise
+
+    def _execute_query(self, query: str) -> List[Mapping[str, Any]]:
+        """
+        プールから接続を取得してSQLクエリを実行（ブロッキング）
+
+        Args:
+            query: 実行するSQLクエリ
+
+        Returns:
+            List[Mapping[str, Any]]: クエリ結果（カラム名をキーとする読み取り専用の行）
+        """
+        with self._engine.connect() as conn:
+            # 行ごとに辞書を作らず、カラム名を共有するRowMappingで返す
+            return conn.execute(text(query)).mappings().all()
@@ -6,16 +6,138 @@ LangChainのSQL生成チェーンとデータベースユーティリティを
 """
 
 import logging
-from typing import Dict
+from collections import Counter
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List
 
+from config import DB_RESULT_PROMPT_ROWS
 from langchain.chains import create_sql_query_chain
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
 
 from database.connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# クエリ結果の説明生成用のシステムメッセージ
+_RESULT_SYSTEM_MESSAGE = SystemMessage(
+    content="""あなたはデータベース検索結果を分かりやすく説明するエキスパートです。
+SQLクエリとその実行結果が与えられます。結果を簡潔に日本語で説明してください。
+- 結果の概要を最初に述べてください
+- 重要なデータや傾向を強調してください
+- 技術的なSQLの詳細よりも、結果の意味に焦点を当ててください
+- 結果が空の場合は、その理由を推測してください
+- 表形式のデータは整形して表示してください
+"""
+)
+
+
+def _format_cell(value) -> str:
+    """
+    Markdownの表のセルとして値を文字列に変換
+
+    Args:
+        value: セルの値
+
+    Returns:
+        str: 表の区切り文字と改行をエスケープした文字列
+    """
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def _summarize_column(raw_result, column) -> str:
+    """
+    カラムの値を集計した1行の要約を作成
+
+    数値のカラムは最小値・最大値、それ以外は出現回数の多い値を示します
+
+    Args:
+        raw_result: クエリ結果の行のリスト
+        column: 集計するカラム名
+
+    Returns:
+        str: カラムの要約
+    """
+    values = [row[column] for row in raw_result if row[column] is not None]
+    if not values:
+        return f"- {column}: 値なし"
+
+    if all(
+        isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+        for value in values
+    ):
+        return (
+            f"- {column}: {len(values)}件, 最小 {min(values)}, 最大 {max(values)}"
+        )
+
+    top_values = Counter(map(str, values)).most_common(3)
+    tops = ", ".join(f"{value}（{count}件）" for value, count in top_values)
+    return f"- {column}: {len(values)}件, 上位の値 {tops}"
+
+
+def _result_for_prompt(raw_result) -> str:
+    """
+    説明生成用のプロンプトに含めるクエリ結果を作成
+
+    結果はカラム名を1回だけ含むMarkdownの表にします。
+    行数が多い場合は先頭の行とカラムごとの集計のみを含め、
+    LLMに送るトークン数を結果の件数によらず一定に抑えます
+
+    Args:
+        raw_result: クエリ結果の行のリスト
+
+    Returns:
+        str: プロンプトに含める結果の文字列
+    """
+    if not raw_result:
+        return "（0件）"
+
+    columns = list(raw_result[0].keys())
+    lines = [
+        "| " + " | ".join(_format_cell(column) for column in columns) + " |",
+        "|" + " --- |" * len(columns),
+    ]
+    lines.extend(
+        "| " + " | ".join(_format_cell(row[column]) for column in columns) + " |"
+        for row in raw_result[:DB_RESULT_PROMPT_ROWS]
+    )
+
+    if len(raw_result) > DB_RESULT_PROMPT_ROWS:
+        lines.append(
+            f"...ほか{len(raw_result) - DB_RESULT_PROMPT_ROWS}件"
+            f"（全{len(raw_result)}件、先頭{DB_RESULT_PROMPT_ROWS}件のみ表示）"
+        )
+        lines.append("")
+        lines.append("全件のカラムごとの集計:")
+        lines.extend(_summarize_column(raw_result, column) for column in columns)
+
+    return "\n".join(lines)
+
+
+def _explanation_messages(sql_query: str, raw_result) -> List:
+    """
+    クエリ結果の説明を生成するためのメッセージを作成
+
+    Args:
+        sql_query: 実行したSQLクエリ
+        raw_result: クエリ結果の行のリスト
+
+    Returns:
+        List: LLMに渡すメッセージのリスト
+    """
+    return [
+        _RESULT_SYSTEM_MESSAGE,
+        HumanMessage(
+            content=f"""
+クエリ: {sql_query}
+
+結果: {_result_for_prompt(raw_result)}
+
+上記のクエリと結果に基づいた分析と説明:
+"""
+        ),
+    ]
+
 
 class NaturalLanguageQueryProcessor:
     """
@@ -41,52 +163,27 @@ class NaturalLanguageQueryProcessor:
         LangChainのチェーンを初期化
         データベース接続が行われていない場合は自動的に接続します。
         """
-        from config import ANTHROPIC_MODEL_NAME, MODEL_TEMPERATURE
-        from langchain_anthropic import ChatAnthropic
-        from langchain_core.messages import HumanMessage, SystemMessage
+        from config import ANTHROPIC_MODEL_NAME
+        from models.registry import get_llm
 
         # データベースに接続
         if (
-            not hasattr(self.db_connection, "_langchain_db")
-            or self.db_connection._langchain_db is None
+            not hasattr(self.db_connection, "_engine")
+            or self.db_connection._engine is None
         ):
             await self.db_connection.connect()
 
         # LangChain SQLDatabaseインスタンスを取得
         self._sql_database = self.db_connection.get_langchain_db()
 
-        # SQLクエリ生成用のLLM
-        llm = ChatAnthropic(model=ANTHROPIC_MODEL_NAME, temperature=MODEL_TEMPERATURE)
+        # SQLクエリ生成用のLLM（モデルハンドラーと同じインスタンスを共有）
+        llm = get_llm("anthropic", ANTHROPIC_MODEL_NAME)
 
         # SQLクエリ生成チェーン
         self._query_chain = create_sql_query_chain(llm, self._sql_database)
 
-        # 結果整形用のチェーン
-        result_prompt = ChatPromptTemplate.from_messages(
-            [
-                SystemMessage(
-                    content="""あなたはデータベース検索結果を分かりやすく説明するエキスパートです。
-SQLクエリとその実行結果が与えられます。結果を簡潔に日本語で説明してください。
-- 結果の概要を最初に述べてください
-- 重要なデータや傾向を強調してください
-- 技術的なSQLの詳細よりも、結果の意味に焦点を当ててください
-- 結果が空の場合は、その理由を推測してください
-- 表形式のデータは整形して表示してください
-"""
-                ),
-                HumanMessage(
-                    content="""
-クエリ: {query}
-
-結果: {result}
-
-上記のクエリと結果に基づいた分析と説明:
-"""
-                ),
-            ]
-        )
-
-        self._result_formatter_chain = result_prompt | llm | StrOutputParser()
+        # 結果整形用のチェーン（メッセージは_explanation_messagesで直接組み立てる）
+        self._result_formatter_chain = llm | StrOutputParser()
 
         logger.info("自然言語クエリプロセッサが初期化されました")
 
@@ -104,22 +201,13 @@ SQLクエリとその実行結果が与えられます。結果を簡潔に日
             await self.initialize()
 
         try:
-            # スキーマ情報を取得
-            schema_info = self.db_connection.get_schema_info()
-
-            # 自然言語からSQLクエリを生成
-            sql_query = await self._query_chain.ainvoke(
-                {"question": natural_language_query, "schema": schema_info}
+            sql_query, raw_result = await self._generate_and_execute(
+                natural_language_query
             )
 
-            logger.info(f"生成されたSQLクエリ: {sql_query}")
-
-            # クエリを実行
-            raw_result = await self.db_connection.execute_raw_query(sql_query)
-
             # 結果を整形
             formatted_explanation = await self._result_formatter_chain.ainvoke(
-                {"query": sql_query, "result": raw_result}
+                _explanation_messages(sql_query, raw_result)
             )
 
             return {
@@ -129,12 +217,76 @@ SQLクエリとその実行結果が与えられます。結果を簡潔に日
             }
 
         except Exception as e:
-            logger.error(f"クエリ処理エラー: {str(e)}")
+            logger.error("クエリ処理エラー: %s", e)
             return {
                 "error": str(e),
                 "explanation": f"クエリの処理中にエラーが発生しました: {str(e)}",
             }
 
+    async def stream_query(
+        self, natural_language_query: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        自然言語クエリを処理し、結果の説明をストリーミングで返す
+
+        SQLの実行結果を最初に返し、続けて説明文を生成されたそばから順に返すため、
+        説明の生成完了を待たずに結果を表示し始められます
+
+        Args:
+            natural_language_query: 自然言語のクエリ
+
+        Yields:
+            Dict[str, Any]: 以下のいずれかのイベント
+                - {"type": "result", "query": SQLクエリ, "raw_result": 生データ}
+                - {"type": "explanation_chunk", "text": 説明文の断片}
+                - {"type": "error", "error": エラー内容, "explanation": エラーの説明}
+        """
+        if self._query_chain is None:
+            await self.initialize()
+
+        try:
+            sql_query, raw_result = await self._generate_and_execute(
+                natural_language_query
+            )
+            yield {"type": "result", "query": sql_query, "raw_result": raw_result}
+
+            async for chunk in self._result_formatter_chain.astream(
+                _explanation_messages(sql_query, raw_result)
+            ):
+                yield {"type": "explanation_chunk", "text": chunk}
+
+        except Exception as e:
+            logger.error("クエリ処理エラー: %s", e)
+            yield {
+                "type": "error",
+                "error": str(e),
+                "explanation": f"クエリの処理中にエラーが発生しました: {str(e)}",
+            }
+
+    async def _generate_and_execute(self, natural_language_query: str):
+        """
+        自然言語クエリからSQLを生成して実行
+
+        Args:
+            natural_language_query: 自然言語のクエリ
+
+        Returns:
+            tuple: (生成されたSQLクエリ, クエリ結果)
+        """
+        # スキーマ情報を取得（接続ごとにキャッシュ済み）
+        schema_info = self.db_connection.schema_info
+
+        # 自然言語からSQLクエリを生成
+        sql_query = await self._query_chain.ainvoke(
+            {"question": natural_language_query, "schema": schema_info}
+        )
+
+        logger.info("生成されたSQLクエリ: %s", sql_query)
+
+        # クエリを実行
+        raw_result = await self.db_connection.execute_raw_query(sql_query)
+        return sql_query, raw_result
+
     async def close(self) -> None:
         """リソースをクリーンアップする"""
         await self.db_connection.disconnect()
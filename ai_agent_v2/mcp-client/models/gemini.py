@@ -5,21 +5,34 @@ Geminiモデルとの連携と処理を担当します
 LangChainを使用して実装
 """
 
+import asyncio
 import json
-from typing import List
+import logging
+from typing import AsyncIterator, List
 
 from config import (
     GEMINI_API_KEY,
     GEMINI_MODEL_NAME,
-    MAX_TOKENS,
-    MODEL_TEMPERATURE,
+    LLM_MAX_CONCURRENCY,
+    SIMPLE_MODE_SYSTEM_PROMPT,
     SYSTEM_PROMPT,
 )
+from core.cache import ResponseCache, SingleFlight
+from core.utils import ToolDispatcher, json_loads
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.tools import Tool
-from langchain_google_genai import ChatGoogleGenerativeAI
+
+from models.registry import get_llm
+
+logger = logging.getLogger(__name__)
+
+# 完全モード用のシステムプロンプトテンプレート
+FULL_MODE_PROMPT_TEMPLATE = """{system_prompt}
+あなたは完全モードで実行されています。
+以下のツールが利用可能です: {tool_names}
+これらのツールを活用して、ユーザーの質問に答えてください。
+"""
 
 
 class GeminiModelHandler:
@@ -36,53 +49,110 @@ class GeminiModelHandler:
         if not GEMINI_API_KEY:
             print("Warning: GEMINI_API_KEY not found in environment variables")
 
-        # LangChain ChatGoogleGenerativeAIモデルの初期化
-        self.llm = ChatGoogleGenerativeAI(
-            model=GEMINI_MODEL_NAME,
-            temperature=MODEL_TEMPERATURE,
-            max_output_tokens=MAX_TOKENS,
-            google_api_key=GEMINI_API_KEY,
-            convert_system_message_to_human=True,  # Geminiは一部のバージョンでSystemMessageをサポートしていないため
-        )
+        # LangChain ChatGoogleGenerativeAIモデル（プロセス内で共有するインスタンス）
+        self.llm = get_llm("gemini", GEMINI_MODEL_NAME)
 
         # システムプロンプトの設定
         self.system_prompt = SYSTEM_PROMPT
 
-    def _convert_tools_for_langchain(self, mcp_tools) -> List[Tool]:
+        # LangChainツールへの変換結果のキャッシュ（ツール構成とツール実行関数ごと）
+        self._tools_key = None
+        self._langchain_tools = None
+
+        # ツールを設定した実行チェーンとシステムメッセージのキャッシュ（ツール構成ごと）
+        self._chain_tools = None
+        self._tool_chain = None
+        self._tool_system_message = None
+
+        # 構造化モード用のシステムメッセージ（システムプロンプトは固定のため一度だけ作成）
+        self._structured_system_message = SystemMessage(
+            content=f"{self.system_prompt}\n応答はJSON形式で構造化してください。"
+        )
+
+        # 簡易モード用のシステムメッセージと実行チェーン（ツールを使わないため一度だけ作成）
+        # （メッセージは直接組み立てて渡し、プロンプトテンプレートの展開を省く）
+        self._simple_system_message = SystemMessage(content=SIMPLE_MODE_SYSTEM_PROMPT)
+        self._simple_chain = self.llm | StrOutputParser()
+
+        # 同時に届いた同じ簡易モードのクエリはLLMへの1回のリクエストにまとめる
+        self._simple_inflight = SingleFlight()
+
+        # LLMへの同時リクエスト数の上限（Slackからクエリが集中した場合に備える）
+        self._llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+    async def _ainvoke(self, chain, messages):
         """
-        MCPツールをLangChainのTool形式に変換
+        LLMへの同時リクエスト数を制限してチェーンを実行
+
+        Args:
+            chain: 実行するチェーン
+            messages: LLMに渡すメッセージのリスト
+
+        Returns:
+            Any: チェーンの実行結果
+        """
+        async with self._llm_semaphore:
+            return await chain.ainvoke(messages)
+
+    async def warm_up(self):
+        """
+        Gemini APIへの接続を事前に確立
+
+        初回クエリで接続確立のコストを払わないよう、クエリと同じ非同期クライアントで
+        出力を1トークンに制限したリクエストを送り、チャネルを温めておきます。
+        失敗しても通常のクエリ処理には影響しないため、エラーは無視します。
+        """
+        try:
+            await self.llm.ainvoke("ping", generation_config={"max_output_tokens": 1})
+        except Exception as e:
+            logger.debug("Gemini接続のウォームアップに失敗しました: %s", e)
+
+    def _convert_tools_for_langchain(self, mcp_tools, tool_executor) -> List[Tool]:
+        """
+        MCPツールを、tool_executorで実行するLangChainのTool形式に変換
+
+        作成したToolは共有されるため、実行関数は作成時に設定し、後から差し替えません
+        （差し替えると並行するクエリが互いのtool_executorでツールを実行してしまう）
 
         Args:
             mcp_tools: MCPツールのリスト
+            tool_executor: ツール実行のためのコールバック関数
 
         Returns:
             List[Tool]: LangChainのツールリスト
         """
+        # ツールの名前と説明、ツール実行関数が変わらない限り前回の変換結果を再利用
+        tools_key = (
+            tuple((tool.name, tool.description) for tool in mcp_tools),
+            tool_executor,
+        )
+        if tools_key == self._tools_key:
+            return self._langchain_tools
+
         tools = []
 
         for tool in mcp_tools:
             # 入力スキーマの処理
             try:
                 input_schema = (
-                    json.loads(tool.inputSchema)
+                    json_loads(tool.inputSchema)
                     if isinstance(tool.inputSchema, str)
                     else tool.inputSchema
                 )
             except (TypeError, json.JSONDecodeError):
                 input_schema = {"type": "object", "properties": {}}
 
-            # ツールの関数を定義（後でtool_executorに渡す）
-            async def tool_func(tool_name=tool.name, **kwargs):
-                # この関数は実行時に適切なtool_executorを使ってオーバーライドされる
-                pass
-
-            # LangChainのTool形式に変換
+            # LangChainのTool形式に変換（ツール名を付けてtool_executorに委譲する）
             langchain_tool = Tool(
-                name=tool.name, description=tool.description, func=tool_func
+                name=tool.name,
+                description=tool.description,
+                func=ToolDispatcher(tool_executor, tool.name),
             )
 
             tools.append(langchain_tool)
 
+        self._tools_key = tools_key
+        self._langchain_tools = tools
         return tools
 
     async def process_query_simple(self, query: str):
@@ -95,30 +165,45 @@ class GeminiModelHandler:
         Returns:
             str: Geminiの応答
         """
-        # プロンプトテンプレートの作成
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                SystemMessage(
-                    content="""あなたはSlackに接続された日本語で対応するアシスタントです。
-簡易モードで実行されているため、外部サービスへの接続はできません。
-ユーザーの質問に直接回答してください。
-日本語で丁寧に回答してください。"""
-                ),
-                HumanMessage(content="{query}"),
-            ]
-        )
-
         # LangChainの実行チェーン
-        chain = prompt | self.llm | StrOutputParser()
+        chain = self._simple_chain
 
         try:
-            # チェーンを実行して結果を取得
-            result = await chain.ainvoke({"query": query})
+            # チェーンを実行して結果を取得（実行中の同じクエリがあればその結果を共有）
+            result = await self._simple_inflight.run(
+                ResponseCache.normalize(query),
+                lambda: self._ainvoke(
+                    chain, [self._simple_system_message, HumanMessage(content=query)]
+                ),
+            )
             return result
         except Exception as e:
-            print(f"Error calling Gemini API via LangChain: {str(e)}")
+            logger.error("Error calling Gemini API via LangChain: %s", e)
             return f"申し訳ありません。リクエスト処理中にエラーが発生しました: {str(e)}"
 
+    async def stream_query_simple(self, query: str) -> AsyncIterator[str]:
+        """
+        簡易モードでGeminiの応答をストリーミングで取得 (ツールなし)
+
+        生成されたトークンを順に返すため、応答全体の完了を待たずに表示を始められます
+
+        Args:
+            query: ユーザークエリ
+
+        Yields:
+            str: 応答の断片
+        """
+        chain = self._simple_chain
+        messages = [self._simple_system_message, HumanMessage(content=query)]
+
+        try:
+            async with self._llm_semaphore:
+                async for chunk in chain.astream(messages):
+                    yield chunk
+        except Exception as e:
+            logger.error("Error calling Gemini API via LangChain: %s", e)
+            yield f"申し訳ありません。リクエスト処理中にエラーが発生しました: {str(e)}"
+
     async def process_query(
         self, query: str, mcp_tools, tool_executor, default_channel_id=None
     ):
@@ -134,49 +219,76 @@ class GeminiModelHandler:
         Returns:
             str: Geminiの応答
         """
-        # MCPツールをLangChainツールに変換
-        langchain_tools = self._convert_tools_for_langchain(mcp_tools)
+        chain = self._build_tool_chain(mcp_tools, tool_executor)
+        messages = [self._tool_system_message, HumanMessage(content=query)]
 
-        # ダイナミックツール実行のためのラッパー関数を作成
-        for tool in langchain_tools:
-            # クロージャでツール名をキャプチャし、ツール実行関数をオーバーライド
-            async def _wrapped_executor(tool_name=tool.name, **kwargs):
-                return await tool_executor(tool_name, kwargs)
-
-            # 各ツールの関数を割り当て（クロージャ）
-            tool.func = _wrapped_executor
-
-        # ツール名を抽出してプロンプトに含める
-        tool_names = ", ".join([tool.name for tool in langchain_tools])
+        try:
+            # 処理の実行
+            result = await self._ainvoke(chain, messages)
+            return result
+        except Exception as e:
+            logger.error("Error in LangChain execution: %s", e)
+            return f"申し訳ありません。リクエスト処理中にエラーが発生しました: {str(e)}"
 
-        # カスタマイズされたシステムプロンプト
-        custom_system_prompt = f"""{self.system_prompt}
-あなたは完全モードで実行されています。
-以下のツールが利用可能です: {tool_names}
-これらのツールを活用して、ユーザーの質問に答えてください。
-"""
+    async def stream_query(
+        self, query: str, mcp_tools, tool_executor
+    ) -> AsyncIterator[str]:
+        """
+        LangChain経由でGeminiの応答をストリーミングで取得（ツールあり - 完全モード）
 
-        # LangChain AgentのためのLLMにツールを設定
-        llm_with_tools = self.llm.bind_tools(langchain_tools)
+        生成されたトークンを順に返すため、応答全体の完了を待たずに表示を始められます
 
-        # プロンプトテンプレートの作成
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                SystemMessage(content=custom_system_prompt),
-                HumanMessage(content="{query}"),
-            ]
-        )
+        Args:
+            query: ユーザークエリ
+            mcp_tools: 利用可能なMCPツールのリスト
+            tool_executor: ツール実行のためのコールバック関数
 
-        # LangChainの実行チェーン
-        chain = prompt | llm_with_tools | StrOutputParser()
+        Yields:
+            str: 応答の断片
+        """
+        chain = self._build_tool_chain(mcp_tools, tool_executor)
+        messages = [self._tool_system_message, HumanMessage(content=query)]
 
         try:
-            # 処理の実行
-            result = await chain.ainvoke({"query": query})
-            return result
+            async with self._llm_semaphore:
+                async for chunk in chain.astream(messages):
+                    yield chunk
         except Exception as e:
-            print(f"Error in LangChain execution: {str(e)}")
-            return f"申し訳ありません。リクエスト処理中にエラーが発生しました: {str(e)}"
+            logger.error("Error in LangChain execution: %s", e)
+            yield f"申し訳ありません。リクエスト処理中にエラーが発生しました: {str(e)}"
+
+    def _build_tool_chain(self, mcp_tools, tool_executor):
+        """
+        ツールを設定したLangChain実行チェーンを作成
+
+        Args:
+            mcp_tools: 利用可能なMCPツールのリスト
+            tool_executor: ツール実行のためのコールバック関数
+
+        Returns:
+            Runnable: ツール付きLLM→文字列出力のチェーン
+        """
+        # MCPツールをLangChainツールに変換
+        langchain_tools = self._convert_tools_for_langchain(mcp_tools, tool_executor)
+
+        # ツール構成が変わらない限り、ツールを設定したチェーンを再利用
+        # （変換結果はツール構成と実行関数ごとにキャッシュされるため、同一リストかどうかで判定できる）
+        if langchain_tools is not self._chain_tools:
+            # LangChain AgentのためのLLMにツールを設定
+            llm_with_tools = self.llm.bind_tools(langchain_tools)
+
+            # ツール名を含むシステムメッセージ
+            self._tool_system_message = SystemMessage(
+                content=FULL_MODE_PROMPT_TEMPLATE.format(
+                    system_prompt=self.system_prompt,
+                    tool_names=", ".join(tool.name for tool in langchain_tools),
+                )
+            )
+
+            # LangChainの実行チェーン
+            self._tool_chain = llm_with_tools | StrOutputParser()
+            self._chain_tools = langchain_tools
+        return self._tool_chain
 
     async def process_structured_query(self, query: str, mcp_tools, tool_executor):
         """
@@ -193,16 +305,8 @@ class GeminiModelHandler:
         """
         from langchain_core.output_parsers import JsonOutputParser
 
-        # MCPツールをLangChainツールに変換
-        langchain_tools = self._convert_tools_for_langchain(mcp_tools)
-
-        # ツール実行関数の設定
-        for tool in langchain_tools:
-
-            async def _wrapped_executor(tool_name=tool.name, **kwargs):
-                return await tool_executor(tool_name, kwargs)
-
-            tool.func = _wrapped_executor
+        # MCPツールをLangChainツールに変換（ツール実行関数は変換時に設定される）
+        langchain_tools = self._convert_tools_for_langchain(mcp_tools, tool_executor)
 
         # JSON出力パーサーの設定
         json_parser = JsonOutputParser()
@@ -210,25 +314,17 @@ class GeminiModelHandler:
         # LLMにツールを設定
         llm_with_tools = self.llm.bind_tools(langchain_tools)
 
-        # JSONレスポンスを要求するプロンプト
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                SystemMessage(
-                    content=f"{self.system_prompt}\n応答はJSON形式で構造化してください。"
-                ),
-                HumanMessage(content="{query}"),
-            ]
-        )
-
-        # JSON出力を生成するチェーン
-        chain = prompt | llm_with_tools | json_parser
+        # JSON出力を生成するチェーン（システムメッセージは初期化時に作成したものを再利用）
+        chain = llm_with_tools | json_parser
 
         try:
             # チェーンを実行して構造化された結果を取得
-            result = await chain.ainvoke({"query": query})
+            result = await self._ainvoke(
+                chain, [self._structured_system_message, HumanMessage(content=query)]
+            )
             return result
         except Exception as e:
-            print(f"Error in structured LangChain execution: {str(e)}")
+            logger.error("Error in structured LangChain execution: %s", e)
             return {
                 "error": str(e),
                 "message": "JSONレスポンスの生成中にエラーが発生しました",
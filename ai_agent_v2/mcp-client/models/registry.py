@@ -0,0 +1,66 @@
+"""
+LLMインスタンス管理モジュール
+
+プロバイダーとモデル設定ごとにLangChainのチャットモデルを1つだけ作成し、
+モデルハンドラー・エージェント・DBクエリ処理で共有します
+"""
+
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from config import ANTHROPIC_API_KEY, GEMINI_API_KEY, MAX_TOKENS, MODEL_TEMPERATURE
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_llm(
+    provider: str,
+    model_name: str,
+    temperature: float = MODEL_TEMPERATURE,
+    max_tokens: int = MAX_TOKENS,
+) -> "BaseChatModel":
+    """
+    プロバイダーとモデル設定に対応するチャットモデルを取得
+
+    インスタンスごとにHTTPクライアントと接続プールが作られるため、
+    同じ設定の呼び出しには作成済みのインスタンスを返し、接続を再利用します。
+    各プロバイダーのSDKは使用する時点で読み込み、使わないSDKは読み込みません
+
+    Args:
+        provider: モデルプロバイダー（"anthropic" または "gemini"）
+        model_name: モデル名
+        temperature: 温度
+        max_tokens: 最大出力トークン数
+
+    Returns:
+        BaseChatModel: LangChainのチャットモデル
+    """
+    logger.debug("LLMインスタンスを作成します: %s/%s", provider, model_name)
+
+    if provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+
+        return ChatAnthropic(
+            model=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            anthropic_api_key=ANTHROPIC_API_KEY,
+        )
+
+    if provider == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        return ChatGoogleGenerativeAI(
+            model=model_name,
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            google_api_key=GEMINI_API_KEY,
+            convert_system_message_to_human=True,  # Geminiは一部のバージョンでSystemMessageをサポートしていないため
+        )
+
+    raise ValueError(f"未対応のモデルプロバイダーです: {provider}")
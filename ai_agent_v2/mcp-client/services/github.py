@@ -4,9 +4,26 @@ GitHub サービスモジュール
 GitHub APIとの連携機能を提供します
 """
 
+import asyncio
 import re
 
-from core.utils import analyze_code_issues
+from core.utils import analyze_code_issues, format_error
+
+# クエリ中の引用符で囲まれた検索語
+_QUOTED_TERM_RE = re.compile(r'"([^"]+)"')
+# コード検索結果に含まれるソースファイルのパス
+_CODE_FILE_PATH_RE = re.compile(r"[a-zA-Z0-9_\-/.]+\.(?:py|js|ts|go|java|rb)")
+# コード検索結果に含まれるリポジトリ名（owner/repo:）
+_REPO_NAME_RE = re.compile(r"[a-zA-Z0-9_\-.]+/[a-zA-Z0-9_\-.]+(?=:)")
+
+# クエリの種類を判定するキーワード（グループ名が種類）
+# 全種類を1つのパターンにまとめ、クエリを1回走査するだけで含まれる種類を判定します
+_INTENT_KEYWORD_RE = re.compile(
+    "(?P<repo>リポジトリ|レポジトリ|repository)"
+    "|(?P<code>コード検索|code search)"
+    "|(?P<issue>問題|issue|バグ)",
+    re.IGNORECASE,
+)
 
 
 class GitHubService:
@@ -35,34 +52,20 @@ class GitHubService:
         """
         try:
             # Check available GitHub tools
-            tools = await self.tool_manager.list_available_tools()
-            tool_names = [tool.name for tool in tools]
-
-            results = []
+            tool_names = await self.tool_manager.available_tool_names()
 
             # Parse query to identify what to search for
-            query_lower = query.lower()
+            intents = {match.lastgroup for match in _INTENT_KEYWORD_RE.finditer(query)}
 
             # Repository related searches
-            if (
-                "リポジトリ" in query
-                or "レポジトリ" in query
-                or "repository" in query_lower
-            ):
-                if "github_list_repos" in tool_names:
-                    result = await self.tool_manager.execute_tool(
-                        "github_list_repos", {}
-                    )
-                    repos_info = result
-                    results.append(f"リポジトリ一覧:\n{repos_info}")
+            want_repos = "github_list_repos" in tool_names and "repo" in intents
 
             # Code search related
             code_search_terms = []
-            if "コード検索" in query or "code search" in query_lower:
+            if "code" in intents:
                 # Extract potential search terms from the query
                 # Look for terms in quotes or specific keywords
-                quote_pattern = r'"([^"]+)"'
-                quoted_terms = re.findall(quote_pattern, query)
+                quoted_terms = _QUOTED_TERM_RE.findall(query)
 
                 if quoted_terms:
                     code_search_terms.extend(quoted_terms)
@@ -79,77 +82,98 @@ class GitHubService:
                         code_search_terms.extend(
                             potential_terms[:2]
                         )  # Use first 2 longer terms
-
-            # Perform code search if we have terms
-            if code_search_terms and "github_search_code" in tool_names:
-                for term in code_search_terms:
-                    result = await self.tool_manager.execute_tool(
-                        "github_search_code", {"query": term}
-                    )
-                    search_results = result
-                    results.append(f"「{term}」のコード検索結果:\n{search_results}")
-
-                    # If we find code, analyze it for potential issues
-                    if (
-                        search_results
-                        and len(search_results) > 10
-                        and "github_get_content" in tool_names
-                    ):
-                        # Extract a file path from the search results
-                        file_paths = re.findall(
-                            r"([a-zA-Z0-9_\-/\.]+\.(py|js|ts|go|java|rb))",
-                            search_results,
-                        )
-
-                        if file_paths:
-                            # Get the first file content
-                            file_path = file_paths[0][0]
-                            repo_name = None
-
-                            # Try to extract repo name from search results
-                            repo_match = re.search(
-                                r"([a-zA-Z0-9_\-\.]+/[a-zA-Z0-9_\-\.]+):",
-                                search_results,
-                            )
-                            if repo_match:
-                                repo_name = repo_match.group(1)
-
-                            if repo_name:
-                                content_result = await self.tool_manager.execute_tool(
-                                    "github_get_content",
-                                    {"repo": repo_name, "path": file_path},
-                                )
-                                file_content = content_result
-
-                                # Analyze code for potential issues
-                                analysis = analyze_code_issues(file_content, term)
-                                if analysis:
-                                    results.append(
-                                        f"ファイル「{file_path}」の問題分析:\n{analysis}"
-                                    )
+            if "github_search_code" not in tool_names:
+                code_search_terms = []
 
             # Issue related searches
-            if "問題" in query or "issue" in query_lower or "バグ" in query:
-                if "github_list_issues" in tool_names:
-                    result = await self.tool_manager.execute_tool(
-                        "github_list_issues", {"state": "open"}
+            want_issues = "github_list_issues" in tool_names and "issue" in intents
+
+            # 互いに依存しない取得（リポジトリ一覧・コード検索・未解決の問題）を並行して実行
+            tool_calls = [
+                ("github_search_code", {"query": term}) for term in code_search_terms
+            ]
+            if want_repos:
+                tool_calls.insert(0, ("github_list_repos", {}))
+            if want_issues:
+                tool_calls.append(("github_list_issues", {"state": "open"}))
+            fetched = iter(await self.tool_manager.execute_cached_tools(tool_calls))
+            repos_info = next(fetched) if want_repos else None
+            search_results = [next(fetched) for _ in code_search_terms]
+            issues_info = next(fetched) if want_issues else None
+
+            # If we find code, analyze the first file of each search result
+            # （ファイル内容の取得も検索語ごとに並行して実行）
+            content_targets = []  # (検索結果の位置, ファイルパス, リポジトリ名)
+            if "github_get_content" in tool_names:
+                for i, search_result in enumerate(search_results):
+                    if not search_result or len(search_result) <= 10:
+                        continue
+                    file_path_match = _CODE_FILE_PATH_RE.search(search_result)
+                    if not file_path_match:
+                        continue
+                    # Try to extract repo name from search results
+                    repo_match = _REPO_NAME_RE.search(search_result)
+                    if repo_match:
+                        content_targets.append(
+                            (i, file_path_match.group(), repo_match.group())
+                        )
+            contents = await self.tool_manager.execute_cached_tools(
+                [
+                    ("github_get_content", {"repo": repo_name, "path": file_path})
+                    for _, file_path, repo_name in content_targets
+                ]
+            )
+            # Analyze code for potential issues
+            # （正規表現による走査はCPU処理のため、イベントループを止めないようスレッドで並行実行）
+            code_analyses = await asyncio.gather(
+                *(
+                    asyncio.to_thread(
+                        analyze_code_issues, file_content, code_search_terms[i]
                     )
-                    issues_info = result
-                    results.append(f"未解決の問題一覧:\n{issues_info}")
+                    for (i, _, _), file_content in zip(content_targets, contents)
+                )
+            )
+            analyses = {}  # 検索結果の位置→問題分析
+            for (i, file_path, _), analysis in zip(content_targets, code_analyses):
+                if analysis:
+                    analyses[i] = f"ファイル「{file_path}」の問題分析:\n{analysis}"
+
+            # 結果を元の順序（リポジトリ→コード検索→問題）でまとめる
+            # 大きなツール出力は見出しとf文字列で連結せず断片のまま並べ、
+            # 最後の1回のjoinでだけコピーする
+            parts = []
+
+            def add_section(*pieces):
+                if parts:
+                    parts.append("\n\n")
+                parts.extend(pieces)
+
+            if want_repos:
+                add_section("リポジトリ一覧:\n", repos_info)
+            for i, (term, search_result) in enumerate(
+                zip(code_search_terms, search_results)
+            ):
+                add_section(f"「{term}」のコード検索結果:\n", search_result)
+                if i in analyses:
+                    add_section(analyses[i])
+            if want_issues:
+                add_section("未解決の問題一覧:\n", issues_info)
 
             # If no specific search was performed, fallback to general repo info
-            if not results:
+            if not parts:
                 if "github_list_repos" in tool_names:
-                    result = await self.tool_manager.execute_tool(
+                    result = await self.tool_manager.execute_cached_tool(
                         "github_list_repos", {}
                     )
                     return result
                 elif "github_get_user" in tool_names:
-                    result = await self.tool_manager.execute_tool("github_get_user", {})
+                    result = await self.tool_manager.execute_cached_tool(
+                        "github_get_user", {}
+                    )
                     return result
                 else:
                     return "利用可能なGitHubツールが見つかりませんでした"
 
-            return "\n\n".join(results)
+            return "".join(parts)
         except Exception as e:
-            return f"GitHub情報取得エラー: {str(e)}"
+            return format_error("GitHub情報取得エラー", e)
@@ -4,9 +4,27 @@ Notion サービスモジュール
 Notion APIとの連携機能を提供します
 """
 
-import json
 import re
-from datetime import datetime, timedelta
+
+from core.utils import (
+    due_date_from_today,
+    format_error,
+    iter_json_array,
+    parse_tool_json,
+)
+
+# GitHub情報の「ファイル「パス」」の表記からファイルパスを抽出
+_FILE_MARK_RE = re.compile(r"ファイル「([^」]+)」")
+
+# タスク管理用とみなすNotionデータベースのタイトルのキーワード
+_TASK_DB_TITLE_RE = re.compile("task|project|todo", re.IGNORECASE)
+
+# 作成するタスクのうち、タスクごとに変わらないプロパティ
+# （各タスクではこれを浅くコピーし、タイトルと期限だけを追加する。共有するため変更しないこと）
+_TASK_PROPERTY_TEMPLATE = {
+    "Status": {"select": {"name": "未着手"}},
+    "Priority": {"select": {"name": "中"}},
+}
 
 
 class NotionService:
@@ -36,8 +54,7 @@ class NotionService:
         """
         try:
             # Check available Notion tools
-            tools = await self.tool_manager.list_available_tools()
-            tool_names = [tool.name for tool in tools]
+            tool_names = await self.tool_manager.available_tool_names()
 
             if "notion_create_page" not in tool_names:
                 return "Notionページ作成ツールが利用できません"
@@ -49,9 +66,9 @@ class NotionService:
             code_file = None
 
             # Extract file paths mentioned
-            file_paths = re.findall(r"ファイル「([^」]+)」", github_info)
-            if file_paths:
-                code_file = file_paths[0]
+            file_mark = _FILE_MARK_RE.search(github_info)
+            if file_mark:
+                code_file = file_mark.group(1)
                 task_title = f"{code_file} の修正"
 
             # Extract issues
@@ -107,21 +124,13 @@ class NotionService:
                 databases_info = result
 
                 # Try to find a Tasks or Projects database
+                # （見つかった時点で打ち切り、残りのデータベース一覧はパースしない）
                 try:
-                    if isinstance(
-                        databases_info, str
-                    ) and databases_info.strip().startswith("{"):
-                        databases = json.loads(databases_info)
-                        for db in databases.get("results", []):
-                            db_title = db.get("title", "").lower()
-                            if (
-                                "task" in db_title
-                                or "project" in db_title
-                                or "todo" in db_title
-                            ):
-                                database_id = db.get("id")
-                                break
-                except (json.JSONDecodeError, AttributeError):
+                    for db in iter_json_array(databases_info, "results"):
+                        if _TASK_DB_TITLE_RE.search(db.get("title", "")):
+                            database_id = db.get("id")
+                            break
+                except AttributeError:
                     pass
 
             # If we couldn't find a database ID, use a default task database ID if available
@@ -131,16 +140,13 @@ class NotionService:
                 return "タスク用のNotionデータベースが見つかりませんでした"
 
             # Create the task in Notion
+            # Add a due date about a week from now
             properties = {
                 "Name": {"title": [{"text": {"content": task_title}}]},
-                "Status": {"select": {"name": "未着手"}},
-                "Priority": {"select": {"name": "中"}},
+                **_TASK_PROPERTY_TEMPLATE,
+                "Due": {"date": {"start": due_date_from_today(7)}},
             }
 
-            # Add a due date about a week from now
-            due_date = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-            properties["Due"] = {"date": {"start": due_date}}
-
             # Create the page
             result = await self.tool_manager.execute_tool(
                 "notion_create_page",
@@ -156,16 +162,12 @@ class NotionService:
             # Extract page URL for easy access
             page_url = None
             try:
-                response_data = (
-                    json.loads(response_content)
-                    if isinstance(response_content, str)
-                    else response_content
-                )
+                response_data = parse_tool_json(response_content)
                 page_url = response_data.get("url")
-            except (json.JSONDecodeError, AttributeError):
+            except AttributeError:
                 page_url = "URL取得できませんでした"
 
             return f"Notionタスク「{task_title}」が作成されました。\nURL: {page_url}"
 
         except Exception as e:
-            return f"Notionタスク作成エラー: {str(e)}"
+            return format_error("Notionタスク作成エラー", e)
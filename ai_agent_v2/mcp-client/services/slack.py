@@ -4,6 +4,14 @@ Slack サービスモジュール
 Slack APIとの連携機能を提供します
 """
 
+import re
+from itertools import islice
+
+from core.utils import format_error, iter_paragraphs
+
+# 長い応答を要約する際に残す重要なセクションのキーワード
+_IMPORTANT_SECTION_RE = re.compile("問題分析|Notionタスク|URL:|修正手順")
+
 
 class SlackService:
     """
@@ -36,8 +44,9 @@ class SlackService:
                 return "デフォルトのSlackチャンネルIDが設定されていません"
 
             # Check if the content is too long and summarize if needed
-            if len(content) > 2000:
-                message = f"要約された情報:\n```\n{content[:1000]}...\n\n...(長いため省略されました。全部で{len(content)}文字)...\n```"
+            content_length = len(content)
+            if content_length > 2000:
+                message = f"要約された情報:\n```\n{content[:1000]}...\n\n...(長いため省略されました。全部で{content_length}文字)...\n```"
             else:
                 message = f"取得した情報:\n```\n{content}\n```"
 
@@ -48,7 +57,7 @@ class SlackService:
 
             return result
         except Exception as e:
-            return f"Slack投稿エラー: {str(e)}"
+            return format_error("Slack投稿エラー", e)
 
     async def reply_to_slack_thread(
         self, content: str, thread_ts: str, user_id: str
@@ -72,34 +81,29 @@ class SlackService:
             user_mention = f"<@{user_id}>"
 
             # Check if the content is too long and summarize
-            if len(content) > 2000:
-                # Split into paragraphs
-                paragraphs = content.split("\n\n")
+            content_length = len(content)
+            if content_length > 2000:
+                # Split into paragraphs（全段落のリストは作らず、必要な分だけ順に取り出す）
+                paragraphs = iter_paragraphs(content)
 
                 # Take the first paragraph and some key information
-                summary_parts = [paragraphs[0]]
+                summary_parts = [next(paragraphs)]
 
                 # Look for important sections like "問題分析" or "Notionタスク作成"
-                important_sections = []
-                for para in paragraphs:
-                    if any(
-                        keyword in para
-                        for keyword in ["問題分析", "Notionタスク", "URL:", "修正手順"]
-                    ):
-                        important_sections.append(para)
-
-                # Add up to 3 important sections
-                summary_parts.extend(important_sections[:3])
+                # Add up to 3 important sections（3つ見つかった時点で走査を打ち切る）
+                important_sections = (
+                    para for para in paragraphs if _IMPORTANT_SECTION_RE.search(para)
+                )
+                summary_parts.extend(islice(important_sections, 3))
 
                 # Create summarized message
                 summarized_content = "\n\n".join(summary_parts)
-                message = f"{user_mention} 結果の要約です:\n\n{summarized_content}\n\n(詳細は省略されました。全部で{len(content)}文字)"
+                message = f"{user_mention} 結果の要約です:\n\n{summarized_content}\n\n(詳細は省略されました。全部で{content_length}文字)"
             else:
                 message = f"{user_mention}\n\n{content}"
 
             # Check if thread_reply tool is available
-            tools = await self.tool_manager.list_available_tools()
-            tool_names = [tool.name for tool in tools]
+            tool_names = await self.tool_manager.available_tool_names()
 
             if "slack_reply_to_thread" in tool_names:
                 result = await self.tool_manager.execute_tool(
@@ -124,4 +128,4 @@ class SlackService:
                 return result
 
         except Exception as e:
-            return f"Slackスレッド返信エラー: {str(e)}"
+            return format_error("Slackスレッド返信エラー", e)
@@ -5,11 +5,71 @@ MCPツールの呼び出しと結果処理を担当します
 LangChain対応の機能を追加
 """
 
-from typing import List
-
-from core.utils import extract_tool_content, process_tool_arguments
+import asyncio
+import contextvars
+import logging
+import reprlib
+from typing import FrozenSet, List
+
+from config import MCP_TOOL_CONCURRENCY, TOOL_CACHE_PATH, TOOL_CACHE_TTL
+from core.cache import PersistentToolCache
+from core.utils import (
+    extract_tool_content,
+    format_error,
+    make_tool_arg_processor,
+)
 from langchain_core.tools import BaseTool
 
+logger = logging.getLogger(__name__)
+
+# デバッグログに出力するツール引数・結果の表示を短く切り詰める
+# （巨大なツール出力をそのまま文字列化してログに書き出さない）
+_debug_repr = reprlib.Repr()
+_debug_repr.maxstring = 200
+_debug_repr.maxother = 200
+_debug_repr.maxlist = 10
+
+# 副作用のある（書き込み系の）ツール名に含まれるキーワード
+COMMAND_TOOL_KEYWORDS = ("post", "reply", "create", "update", "delete", "add", "send")
+
+# 読み取り専用ツールの結果キャッシュ（全ToolManagerで共有）
+_tool_result_cache = PersistentToolCache(TOOL_CACHE_PATH, TOOL_CACHE_TTL)
+
+
+class CommandToolTracker:
+    """
+    1つのクエリの処理中に書き込み系ツールが実行されたかを記録するクラス
+
+    ContextVarで処理中のクエリに結び付けるため、並行して処理される
+    クエリ同士で記録が混ざりません。子タスクにはコンテキストがコピーされますが、
+    同じインスタンスを参照するため子タスクでのツール実行も記録されます。
+    """
+
+    def __init__(self):
+        """
+        CommandToolTrackerの初期化
+        """
+        self.used = False  # 書き込み系ツールを実行したかどうか
+
+
+# 処理中のクエリの記録先（クエリの処理外ではNone）
+_command_tool_tracker = contextvars.ContextVar("command_tool_tracker", default=None)
+
+
+def track_command_tools() -> CommandToolTracker:
+    """
+    現在のクエリ処理で、書き込み系ツールの実行の記録を開始
+
+    以降に現在のコンテキスト（とそこから作られたタスク）で実行された
+    書き込み系ツールは、どのToolManager経由であっても返り値に記録されます
+
+    Returns:
+        CommandToolTracker: 現在のクエリの記録先
+    """
+    tracker = CommandToolTracker()
+    _command_tool_tracker.set(tracker)
+    return tracker
+
 
 class LangChainToolAdapter(BaseTool):
     """
@@ -19,20 +79,30 @@ class LangChainToolAdapter(BaseTool):
     name: str
     description: str
 
-    def __init__(self, name: str, description: str, tool_manager, tool_executor):
+    @classmethod
+    def create(
+        cls, name: str, description: str, tool_manager, tool_executor
+    ) -> "LangChainToolAdapter":
         """
-        LangChainToolAdapterの初期化
+        LangChainToolAdapterを作成
+
+        名前と説明はMCPサーバーから取得した検証済みの文字列のため、
+        model_constructでPydanticの検証を省いて作成します
 
         Args:
             name: ツール名
             description: ツール説明
             tool_manager: ToolManagerインスタンス
             tool_executor: ツール実行関数
+
+        Returns:
+            LangChainToolAdapter: 作成したツール
         """
-        super().__init__(name=name, description=description)
+        adapter = cls.model_construct(name=name, description=description)
         # フィールドを直接設定 - Pydanticの検証をバイパス
-        self._tool_manager = tool_manager
-        self._tool_executor = tool_executor
+        adapter._tool_manager = tool_manager
+        adapter._tool_executor = tool_executor
+        return adapter
 
     def _run(self, **kwargs) -> str:
         """
@@ -67,17 +137,25 @@ class ToolManager:
     LangChain対応の機能を追加
     """
 
-    def __init__(self, session, default_channel_id=None):
+    def __init__(self, session, default_channel_id=None, tools=None):
         """
         ToolManagerの初期化
 
         Args:
             session: MCPサーバーのセッション
             default_channel_id: デフォルトのSlackチャンネルID
+            tools: 接続時に取得済みのツールリスト（キャッシュの初期値）
         """
         self.session = session
         self.default_channel_id = default_channel_id
+        self._tools_cache = tools  # サーバーのツールリスト（接続中は不変）
+        self._tool_names = None  # ツール名の集合（存在確認用）
+        self._tools_lock = asyncio.Lock()  # ツールリスト取得の同時実行を1回にまとめる
+        self.tool_sessions = {}  # ツール名→実行先セッション（他サーバーのツール用）
+        # 同時に実行するツール呼び出し数の上限（MCPサーバーへの過負荷を防ぐ）
+        self._tool_semaphore = asyncio.Semaphore(MCP_TOOL_CONCURRENCY)
         self.langchain_tools = []  # LangChain用ツールリスト
+        self._langchain_tools_source = None  # langchain_toolsの変換元のツールリスト
 
     async def execute_tool(self, tool_name, tool_args):
         """
@@ -90,36 +168,170 @@ class ToolManager:
         Returns:
             str: 処理されたツール呼び出し結果
         """
-        print(f"Calling tool {tool_name} with input type: {type(tool_args)}")
-        print(f"Input content: {tool_args}")
+        result, _ = await self._call_tool(tool_name, tool_args)
+        return result
 
-        # Process tool arguments
-        tool_args_dict = process_tool_arguments(
-            tool_name, tool_args, self.default_channel_id
-        )
+    async def _call_tool(self, tool_name, tool_args):
+        """
+        ツール呼び出しを実行し、結果とエラーかどうかを返す
+
+        MCPサーバーはレート制限や認証エラーなどの失敗を、例外ではなく
+        isErrorを立てた通常の結果として返すため、その判定も合わせて返します
+
+        Args:
+            tool_name: 呼び出すツールの名前
+            tool_args: ツールに渡す引数
+
+        Returns:
+            tuple: (処理されたツール呼び出し結果, エラーとなった場合はTrue)
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Calling tool %s with input type: %s", tool_name, type(tool_args)
+            )
+            logger.debug("Input content: %s", _debug_repr.repr(tool_args))
+
+        if any(keyword in tool_name for keyword in COMMAND_TOOL_KEYWORDS):
+            # 書き込み系ツールの実行を処理中のクエリに記録
+            tracker = _command_tool_tracker.get()
+            if tracker is not None:
+                tracker.used = True
+
+        # Process tool arguments（ツールごとの処理関数は初回のみ作成され、以降は共有）
+        processor = make_tool_arg_processor(tool_name)
+        tool_args_dict = processor(tool_args, self.default_channel_id)
 
         try:
-            tool_result = await self.session.call_tool(tool_name, tool_args_dict)
-            print(f"Tool result type: {type(tool_result.content)}")
-            print(f"Tool result: {tool_result.content}")
+            # 他サーバーのツールであれば、そのサーバーのセッションで実行
+            session = self.tool_sessions.get(tool_name, self.session)
+            async with self._tool_semaphore:
+                tool_result = await session.call_tool(tool_name, tool_args_dict)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Tool result type: %s", type(tool_result.content))
+                logger.debug("Tool result: %s", _debug_repr.repr(tool_result.content))
 
             # Extract and process the content
-            return extract_tool_content(tool_result.content)
+            return (
+                extract_tool_content(tool_result.content),
+                bool(getattr(tool_result, "isError", False)),
+            )
 
         except Exception as e:
-            error_msg = f"Error calling tool {tool_name}: {str(e)}"
-            print(error_msg)
-            return f"Error: {str(e)}"
+            logger.error("Error calling tool %s: %s", tool_name, e)
+            return format_error("Error", e), True
+
+    async def execute_cached_tool(self, tool_name, tool_args):
+        """
+        読み取り専用ツールを実行し、結果をファイルキャッシュ経由で再利用
+
+        有効期間内に同じツール・引数で呼び出した結果があれば、
+        MCPサーバーを呼び出さずにその結果を返します。
+        書き込み系のツールやエラーとなった結果（サーバーがisErrorを返した場合を含む）は
+        キャッシュしません。
+
+        Args:
+            tool_name: 呼び出すツールの名前
+            tool_args: ツールに渡す引数
+
+        Returns:
+            str: 処理されたツール呼び出し結果
+        """
+        if any(keyword in tool_name for keyword in COMMAND_TOOL_KEYWORDS):
+            return await self.execute_tool(tool_name, tool_args)
+
+        cached = await _tool_result_cache.get(tool_name, tool_args)
+        if cached is not None:
+            logger.debug("Using cached result for tool %s", tool_name)
+            return cached
+
+        result, is_error = await self._call_tool(tool_name, tool_args)
+        if not is_error:
+            await _tool_result_cache.set(tool_name, tool_args, result)
+        return result
+
+    async def execute_cached_tools(self, tool_calls):
+        """
+        互いに依存しない複数の読み取り専用ツール呼び出しを、キャッシュを使って並行実行
+
+        同時実行数はMCP_TOOL_CONCURRENCYまでに制限されます
+
+        Args:
+            tool_calls: (ツール名, 引数) のタプルのリスト
+
+        Returns:
+            list: 各ツール呼び出しの結果（tool_callsと同じ順序）
+        """
+        return await asyncio.gather(
+            *(
+                self.execute_cached_tool(tool_name, tool_args)
+                for tool_name, tool_args in tool_calls
+            )
+        )
 
     async def list_available_tools(self):
         """
         利用可能なツールのリストを取得
 
+        ツールリストはサーバーの再起動まで変わらないため、
+        初回取得時の結果をキャッシュして再利用します。
+        キャッシュがない状態で同時に呼び出された場合も、取得は1回だけ行います
+
         Returns:
             list: 利用可能なツールのリスト
         """
-        response = await self.session.list_tools()
-        return response.tools
+        if self._tools_cache is None:
+            async with self._tools_lock:
+                # ロック待ちの間に他の呼び出しが取得済みであれば再利用
+                if self._tools_cache is None:
+                    response = await self.session.list_tools()
+                    self._tools_cache = response.tools
+        return self._tools_cache
+
+    async def available_tool_names(self) -> FrozenSet[str]:
+        """
+        利用可能なツール名の集合を取得
+
+        ツールの有無をO(1)で確認できるよう、ツールリストから一度だけ作成します
+
+        Returns:
+            FrozenSet[str]: 利用可能なツール名の集合
+        """
+        if self._tool_names is None:
+            tools = await self.list_available_tools()
+            self._tool_names = frozenset(tool.name for tool in tools)
+        return self._tool_names
+
+    def register_server_tools(self, session, tools):
+        """
+        別のMCPサーバーのツールを登録
+
+        登録したツールはツール名に応じて対応するセッションで実行されるため、
+        1つのToolManagerで複数サーバーのツールを扱えます。
+        同じ名前のツールが登録済みの場合（再接続したサーバーの再登録など）は置き換えます
+
+        Args:
+            session: ツールを提供するサーバーのセッション
+            tools: 登録するツールのリスト
+        """
+        names = {tool.name for tool in tools}
+        self._tools_cache = [
+            *(tool for tool in self._tools_cache or [] if tool.name not in names),
+            *tools,
+        ]
+        self._tool_names = None
+        for tool in tools:
+            self.tool_sessions[tool.name] = session
+
+    def invalidate_tools_cache(self):
+        """
+        キャッシュしたツールリストを破棄し、次回の取得時に再取得させる
+
+        ToolManagerは接続ごとにその接続で取得したツールリストで作成されるため、
+        通常の接続・切り替えでは呼び出す必要はありません。接続を維持したまま
+        サーバー側のツール構成が変わった場合に使用します
+        """
+        self._tools_cache = None
+        self._tool_names = None
 
     async def create_langchain_tools(self) -> List[BaseTool]:
         """
@@ -129,23 +341,25 @@ class ToolManager:
             List[BaseTool]: LangChain互換のツールリスト
         """
         tools = await self.list_available_tools()
-        langchain_tools = []
 
-        # ツール実行関数のクロージャを作成
-        async def tool_executor(tool_name, args):
-            return await self.execute_tool(tool_name, args)
+        # ツールリストが前回の変換時から変わっていなければ、作成済みのツールを再利用
+        # （ツールの登録や破棄ではリスト自体が置き換わるため、同一リストかどうかで判定できる）
+        if tools is self._langchain_tools_source:
+            return self.langchain_tools
 
-        # 各ツールをLangChain形式に変換
-        for tool in tools:
-            langchain_tool = LangChainToolAdapter(
+        # 各ツールをLangChain形式に変換（実行関数はToolManagerのメソッドを共有）
+        langchain_tools = [
+            LangChainToolAdapter.create(
                 name=tool.name,
                 description=tool.description,
                 tool_manager=self,
-                tool_executor=tool_executor,
+                tool_executor=self.execute_tool,
             )
-            langchain_tools.append(langchain_tool)
+            for tool in tools
+        ]
 
         self.langchain_tools = langchain_tools
+        self._langchain_tools_source = tools
         return langchain_tools
 
     def get_langchain_tools(self) -> List[BaseTool]: